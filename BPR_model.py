@@ -1,8 +1,12 @@
 import pandas as pd
-from surprise import Dataset, Reader
-from surprise.prediction_algorithms.matrix_factorization import SVDpp as BPR  # SVDpp를 BPR로 사용
-from surprise.model_selection import train_test_split  # train_test_split 임포트 추가
-from sqlalchemy import create_engine
+import numpy as np
+from scipy.sparse import csr_matrix
+from implicit.bpr import BayesianPersonalizedRanking
+from implicit.evaluation import ranking_metrics_at_k
+from sqlalchemy import create_engine, text
+from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+import connectorx as cx
 import joblib
 import logging
 import os
@@ -13,7 +17,38 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-def get_db_engine():
+# 전처리 결과 캐시 (DB 데이터가 바뀌지 않았다면 재학습 시 DB 로드/분할을 건너뜀)
+memory = joblib.Memory(location=os.path.join(os.getcwd(), '.cache'), verbose=0)
+
+# 피드백/행동 타입별 평점 (카테고리 순서와 평점 배열의 인덱스가 일치해야 함)
+FEEDBACK_CATEGORIES = ['dislike', 'view', 'click_external_link', 'read', 'like']
+FEEDBACK_RATINGS = np.array([0.1, 1.0, 2.5, 5.0, 10.0])
+LOG_CATEGORIES = ['view', 'read', 'click_external_link', 'feedback_like']
+LOG_RATINGS = np.array([1.0, 5.0, 2.5, 10.0])
+
+def map_ratings(df, type_column, categories, ratings):
+    # 카테고리 코드로 평점 배열을 한 번에 인덱싱 (정의되지 않은 타입은 코드 -1 → 제외)
+    codes = pd.Categorical(df[type_column], categories=categories).codes
+    mask = codes >= 0
+    return df.loc[mask, ['user_id', 'article_id']].assign(rating=ratings[codes[mask]])
+
+def max_rating_per_pair(frames):
+    # (user_id, article_id)를 하나의 int64 키로 묶어 정렬 후 구간별 최댓값을 구함 (concat/groupby 없이)
+    user_ids = np.concatenate([df['user_id'].to_numpy(dtype=np.int64) for df in frames])
+    article_ids = np.concatenate([df['article_id'].to_numpy(dtype=np.int64) for df in frames])
+    ratings = np.concatenate([df['rating'].to_numpy(dtype=np.float64) for df in frames])
+    if ratings.size == 0:
+        return pd.DataFrame({'user_id': user_ids, 'article_id': article_ids, 'rating': ratings})
+
+    keys = (user_ids << 32) | article_ids
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    boundaries = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    max_ratings = np.maximum.reduceat(ratings[order], boundaries)
+    unique_keys = sorted_keys[boundaries]
+    return pd.DataFrame({'user_id': unique_keys >> 32, 'article_id': unique_keys & 0xFFFFFFFF, 'rating': max_ratings})
+
+def get_db_params():
     db_host = os.getenv('DB_HOST')
     db_user = os.getenv('DB_USER')
     db_pass = os.getenv('DB_PASS')
@@ -26,75 +61,137 @@ def get_db_engine():
         logger.error("환경 변수가 설정되지 않았습니다. .env 파일을 확인하세요.")
         raise ValueError("Missing environment variables.")
 
-    return create_engine(f"mysql+pymysql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}?charset=utf8mb4")
-
-def prepare_data():
-    try:
-        engine = get_db_engine()
-        logger.info("DB에서 데이터 로드 중...")
-
-        df_feedback = pd.read_sql("SELECT user_id, article_id, feedback_type FROM user_feedback", engine)
-        df_log = pd.read_sql("SELECT user_id, article_id, action_type FROM user_article_log", engine)
-        logger.info(f"피드백 수: {len(df_feedback)}, 로그 수: {len(df_log)}")
-
-        rating_map_feedback = {'dislike': 0.1, 'view': 1.0, 'click_external_link': 2.5, 'read': 5.0, 'like': 10.0}
-        rating_map_log = {'view': 1.0, 'read': 5.0, 'click_external_link': 2.5, 'feedback_like': 10.0}
-
-        df_feedback['rating'] = df_feedback['feedback_type'].map(rating_map_feedback)
-        df_feedback = df_feedback[['user_id', 'article_id', 'rating']].dropna()
-        df_log['rating'] = df_log['action_type'].map(rating_map_log)
-        df_log = df_log[['user_id', 'article_id', 'rating']].dropna()
-
-        df_combined = pd.concat([df_feedback, df_log], ignore_index=True)
-        df_final = df_combined.groupby(['user_id', 'article_id'])['rating'].max().reset_index()
+    return db_host, db_user, db_pass, db_name, db_port
 
-        logger.info(f"최종 데이터 수: {len(df_final)}, 고유 사용자: {df_final['user_id'].nunique()}, 고유 기사: {df_final['article_id'].nunique()}")
-        logger.debug(f"Rating 분포:\n{df_final['rating'].value_counts()}")
+# 프로세스당 하나의 엔진(커넥션 풀)을 재사용
+_engine = None
 
-        reader = Reader(rating_scale=(0.1, 10.0))
-        data = Dataset.load_from_df(df_final[['user_id', 'article_id', 'rating']], reader)
-        trainset, testset = train_test_split(data, test_size=0.1, random_state=42)
-        logger.info(f"Train 데이터: {trainset.n_ratings}, Test 데이터: {len(testset)}")
-
-        train_users = {trainset.to_raw_uid(uid) for uid in trainset.all_users()}
-        train_articles = {trainset.to_raw_iid(iid) for iid in trainset.all_items()}
-        cold_start_users = sum(1 for uid, _, _ in testset if uid not in train_users)
-        cold_start_articles = sum(1 for _, iid, _ in testset if iid not in train_articles)
-        logger.info(f"Testset 콜드스타트 사용자: {cold_start_users}, 기사: {cold_start_articles}")
+def get_db_engine():
+    global _engine
+    if _engine is None:
+        db_host, db_user, db_pass, db_name, db_port = get_db_params()
+        _engine = create_engine(
+            f"mysql+pymysql://{quote_plus(db_user)}:{quote_plus(db_pass)}@{db_host}:{db_port}/{db_name}?charset=utf8mb4",
+            pool_size=8, max_overflow=16, pool_recycle=1800, pool_pre_ping=True
+        )
+    return _engine
+
+# ConnectorX 연결 문자열 (Arrow 기반 병렬 로드용)
+def get_connectorx_url():
+    db_host, db_user, db_pass, db_name, db_port = get_db_params()
+    return f"mysql://{quote_plus(db_user)}:{quote_plus(db_pass)}@{db_host}:{db_port}/{db_name}"
+
+def read_sql_arrow(conn_url, query, partition_on='user_id', partition_num=4):
+    # user_id 범위로 분할해 병렬로 가져온 뒤 Arrow 버퍼를 그대로 pandas로 넘김
+    table = cx.read_sql(conn_url, query, return_type="arrow", partition_on=partition_on, partition_num=partition_num)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def read_log_ratings(chunksize=200_000):
+    # 로그 테이블은 서버 측 커서(stream_results)로 chunk 단위로 읽고,
+    # chunk마다 평점 매핑 + (user, article) 최댓값 축약을 해서 메모리 사용을 chunk 크기로 제한
+    engine = get_db_engine()
+    frames = []
+    total_rows = 0
+    with engine.connect().execution_options(stream_results=True) as conn:
+        for chunk in pd.read_sql(text("SELECT user_id, article_id, action_type FROM user_article_log"), conn, chunksize=chunksize):
+            total_rows += len(chunk)
+            frames.append(max_rating_per_pair([map_ratings(chunk, 'action_type', LOG_CATEGORIES, LOG_RATINGS)]))
+    return frames, total_rows
+
+def get_data_fingerprint():
+    # 행 수 + 최대 id (+ 피드백은 수정 시각) 로 데이터 변경 여부를 저렴하게 판단
+    engine = get_db_engine()
+    with engine.connect() as conn:
+        feedback_stats = conn.execute(text("SELECT COUNT(*), MAX(id), MAX(created_at) FROM user_feedback")).fetchone()
+        log_stats = conn.execute(text("SELECT COUNT(*), MAX(id) FROM user_article_log")).fetchone()
+    return tuple(feedback_stats) + tuple(log_stats)
 
-        return trainset, testset
+def prepare_data():
+    try:
+        fingerprint = get_data_fingerprint()
+        logger.info(f"데이터 fingerprint: {fingerprint}")
+        return _prepare_data(fingerprint)
     except Exception as e:
         logger.error(f"데이터 준비 실패: {str(e)}", exc_info=True)
         raise
 
+@memory.cache
+def _prepare_data(fingerprint):
+    conn_url = get_connectorx_url()
+    logger.info("DB에서 데이터 로드 중...")
+
+    # 피드백(ConnectorX)과 로그(스트리밍) 로드는 모두 I/O 대기 위주이므로 동시에 진행
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        feedback_future = executor.submit(read_sql_arrow, conn_url, "SELECT user_id, article_id, feedback_type FROM user_feedback")
+        log_future = executor.submit(read_log_ratings)
+        df_feedback = feedback_future.result()
+        log_frames, log_rows = log_future.result()
+    logger.info(f"피드백 수: {len(df_feedback)}, 로그 수: {log_rows}")
+
+    df_feedback = map_ratings(df_feedback, 'feedback_type', FEEDBACK_CATEGORIES, FEEDBACK_RATINGS)
+
+    df_final = max_rating_per_pair([df_feedback] + log_frames)
+
+    logger.info(f"최종 데이터 수: {len(df_final)}, 고유 사용자: {df_final['user_id'].nunique()}, 고유 기사: {df_final['article_id'].nunique()}")
+    logger.debug(f"Rating 분포:\n{df_final['rating'].value_counts()}")
+
+    # 90/10 분할 (random_state=42 고정)
+    rng = np.random.default_rng(42)
+    shuffled = rng.permutation(len(df_final))
+    n_test = int(np.ceil(len(df_final) * 0.1))
+    test_df = df_final.iloc[shuffled[:n_test]]
+    # BPR은 관측된 상호작용을 모두 positive로 취급하므로 dislike(평점 < 1.0)는 학습에서 제외
+    train_df = df_final.iloc[shuffled[n_test:]]
+    train_df = train_df[train_df['rating'] >= 1.0]
+
+    user_codes, user_ids = pd.factorize(train_df['user_id'])
+    article_codes, article_ids = pd.factorize(train_df['article_id'])
+    train_csr = csr_matrix((train_df['rating'].to_numpy(dtype=np.float32), (user_codes, article_codes)),
+                           shape=(len(user_ids), len(article_ids)))
+    logger.info(f"Train 데이터: {train_csr.nnz}, Test 데이터: {len(test_df)}")
+
+    # 학습셋에 없는 사용자/기사 수를 np.isin 한 번으로 계산
+    cold_start_users = int((~np.isin(test_df['user_id'].to_numpy(), np.asarray(user_ids))).sum())
+    cold_start_articles = int((~np.isin(test_df['article_id'].to_numpy(), np.asarray(article_ids))).sum())
+    logger.info(f"Testset 콜드스타트 사용자: {cold_start_users}, 기사: {cold_start_articles}")
+
+    # 학습 인덱스 공간에 있는 positive 테스트 상호작용만 평가용 행렬로 구성
+    test_positive = test_df[test_df['rating'] >= 1.0]
+    test_user_codes = pd.Index(user_ids).get_indexer(test_positive['user_id'])
+    test_article_codes = pd.Index(article_ids).get_indexer(test_positive['article_id'])
+    known = (test_user_codes >= 0) & (test_article_codes >= 0)
+    test_csr = csr_matrix((np.ones(known.sum(), dtype=np.float32), (test_user_codes[known], test_article_codes[known])),
+                          shape=train_csr.shape)
+
+    return train_csr, test_csr, np.asarray(user_ids), np.asarray(article_ids)
+
 def train_bpr_model():
     try:
         logger.info("BPR 모델 학습 시작")
-        trainset, testset = prepare_data()
+        train_csr, test_csr, user_ids, article_ids = prepare_data()
 
-        model = BPR(n_factors=20, n_epochs=50, lr_all=0.01, reg_all=0.01, random_state=42)
+        # implicit의 BPR은 OpenMP 병렬 C++ 루프로 학습 (CSR: 행=사용자, 열=기사)
+        model = BayesianPersonalizedRanking(factors=20, learning_rate=0.01, regularization=0.01,
+                                            iterations=50, use_gpu=False, random_state=42)
         logger.info("모델 학습 중...")
-        model.fit(trainset)
-
-        predictions = model.test(testset)
-        logger.info(f"Testset 예측 수: {len(predictions)}")
+        model.fit(train_csr, show_progress=False)
 
-        impossible_predictions = sum(1 for pred in predictions if pred.details['was_impossible'])
-        valid_predictions = [pred for pred in predictions if not pred.details['was_impossible']]
-        if valid_predictions:
-            rmse = ((sum((pred.r_ui - pred.est)**2 for pred in valid_predictions) / len(valid_predictions))**0.5)
-            logger.info(f"Testset RMSE: {rmse:.4f}")
+        if test_csr.nnz:
+            metrics = ranking_metrics_at_k(model, train_csr, test_csr, K=10, show_progress=False)
+            logger.info(f"Testset Precision@10: {metrics['precision']:.4f}, MAP@10: {metrics['map']:.4f}, "
+                        f"NDCG@10: {metrics['ndcg']:.4f}, AUC: {metrics['auc']:.4f}")
         else:
-            logger.info("유효한 예측이 없어 RMSE 계산 불가")
-
-        logger.info(f"불가능한 예측 수: {impossible_predictions}")
-        for i, pred in enumerate(predictions[:5]):
-            logger.info(f"User: {pred.uid}, Article: {pred.iid}, Actual: {pred.r_ui:.2f}, Predicted: {pred.est:.2f}, Impossible: {pred.details['was_impossible']}")
+            logger.info("평가 가능한 테스트 상호작용이 없어 지표 계산 불가")
 
+        # 추론 시 U[u] @ V[i] 로 점수를 계산할 수 있도록 factor 행렬과 원본 id를 저장
+        # 압축하지 않아야 app.py에서 mmap_mode='r'로 로드해 여러 워커 프로세스가 페이지 캐시를 공유할 수 있음
         save_dir = os.path.join(os.getcwd(), "model_data")
         os.makedirs(save_dir, exist_ok=True)
-        save_path = os.path.join(save_dir, "bpr_model.pkl")
-        joblib.dump(model, save_path)
+        save_path = os.path.join(save_dir, "bpr_model.joblib")
+        joblib.dump({'user_factors': np.ascontiguousarray(model.user_factors, dtype=np.float32),
+                     'item_factors': np.ascontiguousarray(model.item_factors, dtype=np.float32),
+                     'user_ids': user_ids, 'article_ids': article_ids},
+                    save_path, compress=0)
         logger.info(f"BPR 모델 저장: {save_path}")
         return model
     except Exception as e:
@@ -1,15 +1,29 @@
 import os
 import logging
 import MySQLdb
-from flask import Flask, request, render_template, session, redirect, url_for, flash, jsonify
-from flask_mysqldb import MySQL
+from flask import Flask, request, render_template, session, redirect, url_for, flash, jsonify, g
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+import MySQLdb.cursors
+from dbutils.pooled_db import PooledDB
 from flask_bcrypt import Bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHash
 from dotenv import load_dotenv
-import random
 import uuid
+import queue
+import threading
+import time
+import atexit
+from datetime import datetime
+import redis
+import orjson
+from cachetools import TTLCache, cached
 import joblib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from surprise import Dataset, Reader
 import pandas as pd
+import numpy as np
 
 # 로깅 설정
 logging.basicConfig(filename='app.log', level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -20,17 +34,91 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', os.urandom(24).hex())
 
+# JSON 직렬화/파싱을 orjson(C 구현)으로 처리 (jsonify, request.get_json 모두 적용)
+class ORJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = ORJSONProvider(app)
+
+# HTML/JSON 응답 gzip 압축
+Compress(app)
+
 # MySQL 설정
 app.config['MYSQL_HOST'] = os.getenv('DB_HOST')
 app.config['MYSQL_USER'] = os.getenv('DB_USER')
 app.config['MYSQL_PASSWORD'] = os.getenv('DB_PASS')
 app.config['MYSQL_DB'] = os.getenv('DB_NAME')
 app.config['MYSQL_PORT'] = int(os.getenv('DB_PORT', 3306))
-app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
 
-mysql = MySQL(app)
+# MySQL 커넥션 풀 (요청마다 새로 연결하지 않고 풀에서 빌려 쓰고 반환)
+db_pool = PooledDB(
+    creator=MySQLdb,
+    mincached=2,
+    maxcached=20,
+    maxconnections=50,
+    blocking=True,
+    ping=1,
+    host=app.config['MYSQL_HOST'],
+    user=app.config['MYSQL_USER'],
+    passwd=app.config['MYSQL_PASSWORD'],
+    db=app.config['MYSQL_DB'],
+    port=app.config['MYSQL_PORT'],
+    charset='utf8mb4',
+    cursorclass=MySQLdb.cursors.DictCursor,
+    # 짧은 조회 위주이므로 READ COMMITTED로 undo 보존 범위를 줄임
+    setsession=["SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED"]
+)
+
+def get_db():
+    if 'db' not in g:
+        g.db = db_pool.connection()
+    return g.db
+
+# 오류 처리 중 롤백 (연결이 끊겨 롤백까지 실패해도 원래 오류 처리와 폴백 반환을 막지 않음)
+def rollback_quietly(conn):
+    if conn is None:
+        return
+    try:
+        conn.rollback()
+    except MySQLdb.Error as e:
+        logger.warning(f"Rollback failed: {str(e)}")
+
+@app.teardown_appcontext
+def close_db(exception):
+    db = g.pop('db', None)
+    if db is not None:
+        db.close()
 bcrypt = Bcrypt(app)
 
+# 비밀번호 해시는 argon2id (기존 bcrypt 해시는 로그인 성공 시 argon2로 재해시)
+# 해시/검증은 CPU를 오래 점유하므로 요청 스레드가 아닌 별도 스레드 풀에서 실행
+# argon2/bcrypt는 C 확장 안에서 GIL을 놓으므로 스레드로도 코어별 병렬 처리 (이미 스레드가 떠 있는 프로세스를 fork하지 않음)
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+PASSWORD_POOL_WORKERS = min(4, os.cpu_count() or 1)
+password_pool = ThreadPoolExecutor(max_workers=PASSWORD_POOL_WORKERS, thread_name_prefix='password-hash')
+PASSWORD_TIMEOUT = 2
+
+def _hash_password(password):
+    return password_hasher.hash(password)
+
+def _check_password(password_hash, password):
+    # (검증 성공 여부, 재해시 필요 여부)
+    if password_hash.startswith('$2'):
+        password_ok = bcrypt.check_password_hash(password_hash, password)
+        return password_ok, password_ok
+    try:
+        password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHash):
+        return False, False
+    return True, password_hasher.check_needs_rehash(password_hash)
+
+# 존재하지 않는 이메일도 동일한 해시 비용을 치르도록 하는 더미 해시 (응답 시간으로 계정 존재 여부 노출 방지)
+DUMMY_PASSWORD_HASH = _hash_password(os.urandom(16).hex())
+
 # SVD 모델 로드 함수
 def load_svd_model():
     try:
@@ -38,21 +126,106 @@ def load_svd_model():
         if not os.path.exists(model_path):
             logger.error(f"SVD model not found at {model_path}. Please train the SVD model first by running svd_model.py.")
             return None
-        model = joblib.load(model_path)
+        # 비압축으로 저장된 모델이면 numpy 배열(pu, qi 등)이 읽기 전용 mmap으로 로드되어 워커 간 페이지 캐시 공유
+        model = joblib.load(model_path, mmap_mode='r')
         logger.info(f"SVD model loaded from {model_path}")
         return model
     except Exception as e:
         logger.error(f"Error loading SVD model: {str(e)}", exc_info=True)
         return None
 
-# BPR(SVDpp) 모델 로드 함수
+# Surprise SVD의 predict()를 후보 전체에 대해 한 번에 계산 (global_mean + bu + bi + qi·pu, rating_scale로 clip)
+# biased=False면 사용자/기사를 모두 아는 경우 qi·pu만, 하나라도 모르면 global_mean (Surprise의 PredictionImpossible 기본값)
+def score_svd_candidates(model, user_id, candidate_article_ids):
+    trainset = model.trainset
+    inner_iids = np.array([trainset._raw2inner_id_items.get(article_id, -1) for article_id in candidate_article_ids])
+    known_items = inner_iids >= 0
+    inner_uid = trainset._raw2inner_id_users.get(user_id)
+
+    scores = np.full(len(candidate_article_ids), trainset.global_mean, dtype=np.float64)
+    if model.biased:
+        if inner_uid is not None:
+            scores += model.bu[inner_uid]
+        scores[known_items] += model.bi[inner_iids[known_items]]
+        if inner_uid is not None:
+            scores[known_items] += model.qi[inner_iids[known_items]] @ model.pu[inner_uid]
+    elif inner_uid is not None:
+        scores[known_items] = model.qi[inner_iids[known_items]] @ model.pu[inner_uid]
+    lower_bound, upper_bound = trainset.rating_scale
+    return np.clip(scores, lower_bound, upper_bound)
+
+# BPR factor 모델 (BPR_model.py가 저장한 user/item factor 행렬을 로드 시 한 번만 정리해 두고 재사용)
+class BPRFactorModel:
+    def __init__(self, user_factors, item_factors, user_ids, article_ids):
+        self.user_factors = np.ascontiguousarray(user_factors, dtype=np.float32)
+        self.item_factors = np.ascontiguousarray(item_factors, dtype=np.float32)
+        self.user_index = {raw_id: inner_id for inner_id, raw_id in enumerate(user_ids.tolist())}
+        self.item_index = {raw_id: inner_id for inner_id, raw_id in enumerate(article_ids.tolist())}
+        self.article_ids = np.asarray(article_ids)
+
+    def knows_user(self, user_id):
+        return user_id in self.user_index
+
+    def predict(self, user_id, article_id):
+        inner_uid = self.user_index.get(user_id)
+        inner_iid = self.item_index.get(article_id)
+        if inner_uid is None or inner_iid is None:
+            return None
+        return float(self.user_factors[inner_uid] @ self.item_factors[inner_iid])
+
+    def recommend_excluding(self, user_id, excluded_article_ids, top_n=10):
+        # 전체 기사를 V @ U[u] 로 점수화하고 이미 본 기사만 마스킹 (후보 목록을 따로 만들지 않음)
+        inner_uid = self.user_index.get(user_id)
+        if inner_uid is None or self.article_ids.size == 0:
+            return []
+        scores = self.item_factors @ self.user_factors[inner_uid]
+        if excluded_article_ids:
+            excluded = np.fromiter(excluded_article_ids, dtype=self.article_ids.dtype, count=len(excluded_article_ids))
+            scores[np.isin(self.article_ids, excluded)] = -np.inf
+        k = min(top_n, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top = top[np.isfinite(scores[top])]
+        return self.article_ids[top].tolist()
+
+    def recommend_excluding_batch(self, user_ids, excluded_by_user, top_n=10, block_size=256):
+        # 여러 사용자를 (사용자 블록 × 전체 기사) 행렬곱 한 번으로 점수화 (블록 단위로 메모리 사용량 제한)
+        known_user_ids = [user_id for user_id in user_ids if user_id in self.user_index]
+        recommendations = {}
+        if not known_user_ids or self.article_ids.size == 0:
+            return recommendations
+        k = min(top_n, self.article_ids.size)
+        for start in range(0, len(known_user_ids), block_size):
+            block = known_user_ids[start:start + block_size]
+            inner_uids = [self.user_index[user_id] for user_id in block]
+            scores = self.user_factors[inner_uids] @ self.item_factors.T
+            # 제외할 (행, 기사) 위치를 item_index로 바로 찾아 블록 전체를 한 번에 마스킹 (사용자마다 전체 기사 np.isin 생략)
+            mask_rows = []
+            mask_cols = []
+            for row, user_id in enumerate(block):
+                inner_iids = [self.item_index[article_id] for article_id in excluded_by_user.get(user_id, ()) if article_id in self.item_index]
+                mask_rows.extend([row] * len(inner_iids))
+                mask_cols.extend(inner_iids)
+            scores[mask_rows, mask_cols] = -np.inf
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for row, user_id in enumerate(block):
+                recommendations[user_id] = self.article_ids[top[row][np.isfinite(top_scores[row])]].tolist()
+        return recommendations
+
+# BPR 모델 로드 함수
 def load_bpr_model():
     try:
-        model_path = os.path.join(os.getcwd(), 'model_data', 'bpr_model.pkl')
+        model_path = os.path.join(os.getcwd(), 'model_data', 'bpr_model.joblib')
         if not os.path.exists(model_path):
             logger.error(f"BPR model not found at {model_path}. Please train the BPR model first by running BPR_model.py.")
             return None
-        model = joblib.load(model_path)
+        # factor 행렬은 읽기 전용 mmap으로 로드 (float32 그대로 쓰면 복사 없이 워커 간 공유)
+        data = joblib.load(model_path, mmap_mode='r')
+        model = BPRFactorModel(data['user_factors'], data['item_factors'], data['user_ids'], data['article_ids'])
         logger.info(f"BPR model loaded from {model_path}")
         return model
     except Exception as e:
@@ -63,27 +236,277 @@ def load_bpr_model():
 svd_model = load_svd_model()
 bpr_model = load_bpr_model()
 
+# 추천 결과 캐시 (REDIS_URL이 설정된 경우에만 사용, 사용자별 해시에 알고리즘/개수별로 저장)
+RECOMMENDATION_CACHE_TTL = 300
+REDIS_URL = os.getenv('REDIS_URL')
+redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+# Redis에 저장하는 기사 목록은 orjson으로 직렬화 (pickle.loads는 Redis에 쓸 수 있는 누구나 웹 프로세스에서 코드를 실행할 수 있게 함)
+def dump_articles(articles):
+    return orjson.dumps(articles, default=str)
+
+def load_articles(data):
+    articles = orjson.loads(data)
+    for article in articles:
+        if article.get('published_at'):
+            article['published_at'] = datetime.fromisoformat(article['published_at'])
+    return articles
+
+def _get_cached_field(user_id, field):
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.hget(f"rec:{user_id}", field)
+    except redis.RedisError as e:
+        logger.warning(f"Recommendation cache read failed for user {user_id}: {str(e)}")
+        return None
+
+def _cache_field(user_id, field, value):
+    try:
+        key = f"rec:{user_id}"
+        with redis_client.pipeline() as pipe:
+            pipe.hset(key, field, value)
+            pipe.expire(key, RECOMMENDATION_CACHE_TTL)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Recommendation cache write failed for user {user_id}: {str(e)}")
+
+def get_cached_recommendations(user_id, field):
+    cached = _get_cached_field(user_id, field)
+    if cached is None:
+        return None
+    try:
+        return load_articles(cached)
+    except ValueError:
+        # 이전 형식(pickle)으로 저장된 값 등 읽을 수 없는 값은 캐시 미스로 처리
+        logger.warning(f"Ignoring unreadable recommendation cache entry for user {user_id}, field {field}")
+        return None
+
+def cache_recommendations(user_id, field, articles):
+    if redis_client is None or not articles:
+        return
+    _cache_field(user_id, field, dump_articles(articles))
+
+# 렌더링된 홈 화면 HTML은 UTF-8 바이트 그대로 같은 해시에 저장
+def get_cached_page(user_id, field):
+    cached = _get_cached_field(user_id, field)
+    if cached is None:
+        return None
+    try:
+        return cached.decode('utf-8')
+    except UnicodeDecodeError:
+        logger.warning(f"Ignoring unreadable page cache entry for user {user_id}, field {field}")
+        return None
+
+def cache_page(user_id, field, page):
+    if redis_client is None or not page:
+        return
+    _cache_field(user_id, field, page.encode('utf-8'))
+
+def invalidate_recommendations(user_id):
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(f"rec:{user_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Recommendation cache invalidation failed for user {user_id}: {str(e)}")
+
+# 인기 기사 상위 100개를 주기적으로 집계해 Redis에 저장 (모든 워커 프로세스가 공유)
+POPULAR_ARTICLES_LIMIT = 100
+POPULAR_ARTICLES_CACHE_TTL = 900
+POPULAR_ARTICLES_REFRESH_INTERVAL = 600
+
+def refresh_popular_articles():
+    cur = get_db().cursor()
+    try:
+        cur.execute("""
+            SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
+            FROM articles a
+            LEFT JOIN user_article_log ual ON a.id = ual.article_id
+            GROUP BY a.id
+            ORDER BY COUNT(ual.id) DESC, a.published_at DESC
+            LIMIT %s
+        """, (POPULAR_ARTICLES_LIMIT,))
+        articles = list(cur.fetchall())
+    finally:
+        cur.close()
+    if redis_client is not None:
+        try:
+            redis_client.setex('popular_articles', POPULAR_ARTICLES_CACHE_TTL, dump_articles(articles))
+        except redis.RedisError as e:
+            logger.warning(f"Popular articles cache write failed: {str(e)}")
+    return articles
+
+def _popular_articles_refresher():
+    while True:
+        time.sleep(POPULAR_ARTICLES_REFRESH_INTERVAL)
+        try:
+            with app.app_context():
+                refresh_popular_articles()
+        except Exception as e:
+            logger.error(f"Popular articles refresh failed: {str(e)}", exc_info=True)
+
+if redis_client is not None:
+    threading.Thread(target=_popular_articles_refresher, name='popular-articles-refresher', daemon=True).start()
+
+# 인기 기사 (콜드스타트 폴백용) 는 사용자와 무관하므로 Redis 값을 프로세스 단위로도 2분간 캐시, Redis 미스 시에만 집계 쿼리 실행
+@cached(TTLCache(maxsize=16, ttl=120), lock=threading.Lock())
+def get_popular_articles(top_n=10):
+    if redis_client is not None:
+        try:
+            cached = redis_client.get('popular_articles')
+            if cached is not None:
+                return load_articles(cached)[:top_n]
+        except redis.RedisError as e:
+            logger.warning(f"Popular articles cache read failed: {str(e)}")
+        except ValueError:
+            logger.warning("Ignoring unreadable popular articles cache entry")
+    return refresh_popular_articles()[:top_n]
+
+# 전체 기사 ID 집합 (후보 계산용). 기사 추가는 크롤러 쪽에서만 일어나므로 1분 TTL로 충분
+@cached(TTLCache(maxsize=1, ttl=60), lock=threading.Lock())
+def get_all_article_ids():
+    cur = get_db().cursor()
+    try:
+        cur.execute("SELECT id FROM articles")
+        return frozenset(row['id'] for row in cur.fetchall())
+    finally:
+        cur.close()
+
+# 사용자가 보거나 피드백했거나 이미 추천받은 기사 ID 집합
+def get_interacted_article_ids(cur, user_id):
+    cur.execute("""
+        SELECT article_id FROM user_article_log WHERE user_id = %s
+        UNION
+        SELECT article_id FROM user_feedback WHERE user_id = %s
+        UNION
+        SELECT article_id FROM recommended_articles WHERE user_id = %s
+    """, (user_id, user_id, user_id))
+    interacted_article_ids = {row['article_id'] for row in cur.fetchall()}
+    logger.debug(f"User {user_id} has interacted with {len(interacted_article_ids)} articles.")
+    return interacted_article_ids
+
+# 한 번의 IN 조회에 넣는 최대 사용자 수 (SQL 길이/max_allowed_packet 제한)
+INTERACTED_BATCH_USERS = 1000
+
+# 여러 사용자의 상호작용 기사 ID 집합을 사용자 묶음 단위 조회로 가져옴 (사용자 id → 집합)
+def get_interacted_article_ids_batch(cur, user_ids):
+    user_ids = list(user_ids)
+    interacted_by_user = {user_id: set() for user_id in user_ids}
+    for start in range(0, len(user_ids), INTERACTED_BATCH_USERS):
+        chunk = user_ids[start:start + INTERACTED_BATCH_USERS]
+        placeholders = ','.join(['%s'] * len(chunk))
+        cur.execute(f"""
+            SELECT user_id, article_id FROM user_article_log WHERE user_id IN ({placeholders})
+            UNION
+            SELECT user_id, article_id FROM user_feedback WHERE user_id IN ({placeholders})
+            UNION
+            SELECT user_id, article_id FROM recommended_articles WHERE user_id IN ({placeholders})
+        """, chunk * 3)
+        for row in cur.fetchall():
+            interacted_by_user[row['user_id']].add(row['article_id'])
+    return interacted_by_user
+
+# 상호작용한 기사를 뺀 후보 ID 목록. 전체 기사 ID는 위 캐시와 차집합으로 계산
+def get_unseen_article_ids(cur, user_id):
+    interacted_article_ids = get_interacted_article_ids(cur, user_id)
+    all_article_ids = get_all_article_ids()
+    logger.debug(f"Total articles in DB: {len(all_article_ids)}")
+    return list(all_article_ids - interacted_article_ids)
+
+# 추천 목록 표시용 기사 정보 캐시 (기사 id → 행). 기사는 추가만 되고 수정되지 않으므로 5분 TTL
+article_cache = TTLCache(maxsize=20000, ttl=300)
+article_cache_lock = threading.Lock()
+
+def get_articles_by_ids(cur, article_ids):
+    # 캐시에 없는 기사만 한 번에 조회해 채우고, 요청한 id 순서대로 반환
+    with article_cache_lock:
+        found = {article_id: article_cache.get(article_id) for article_id in article_ids}
+    missing = [article_id for article_id, article in found.items() if article is None]
+    if missing:
+        placeholders = ','.join(['%s'] * len(missing))
+        cur.execute(f"""
+            SELECT id, title, summary, category, published_at, url
+            FROM articles
+            WHERE id IN ({placeholders})
+        """, missing)
+        rows = cur.fetchall()
+        with article_cache_lock:
+            for article in rows:
+                article_cache[article['id']] = article
+        found.update((article['id'], article) for article in rows)
+    return [found[article_id] for article_id in article_ids if found.get(article_id) is not None]
+
+# 기사 원문 URL은 바뀌지 않으므로 Redis에 캐시 (외부 링크 클릭 시 DB 조회 생략)
+ARTICLE_URL_CACHE_TTL = 3600
+
+def get_article_url(article_id):
+    cache_key = f"article:url:{article_id}"
+    if redis_client is not None:
+        try:
+            cached = redis_client.get(cache_key)
+            if cached is not None:
+                return cached.decode('utf-8')
+        except redis.RedisError as e:
+            logger.warning(f"Article URL cache read failed for article {article_id}: {str(e)}")
+
+    cur = None
+    try:
+        cur = get_db().cursor()
+        cur.execute("SELECT url FROM articles WHERE id = %s", (article_id,))
+        article = cur.fetchone()
+    except MySQLdb.Error as e:
+        flash(f"기사 로딩 중 오류 발생: {str(e)}", "error")
+        logger.error(f"View article error {article_id}: {str(e)}", exc_info=True)
+        return None
+    finally:
+        if cur:
+            cur.close()
+    if not article:
+        flash('존재하지 않는 기사입니다.', 'error')
+        return None
+
+    if redis_client is not None:
+        try:
+            redis_client.setex(cache_key, ARTICLE_URL_CACHE_TTL, article['url'])
+        except redis.RedisError as e:
+            logger.warning(f"Article URL cache write failed for article {article_id}: {str(e)}")
+    return article['url']
+
 def store_recommendations(user_id, article_ids, batch_id=None, algorithm_version='keyword_v1'):
+    conn = None
+    cur = None
     try:
-        conn = mysql.connection.cursor().connection
+        conn = get_db()
         cur = conn.cursor()
         session_id = str(uuid.uuid4())[:8] if batch_id is None else batch_id
 
-        for rank, article_id in enumerate(article_ids, 1):
-            try:
-                cur.execute(
-                    """
-                    INSERT INTO recommended_articles 
-                    (user_id, article_id, recommendation_rank, recommendation_score, recommended_at, batch_id, recommendation_algorithm_version, recommendation_session_id)
-                    VALUES (%s, %s, %s, %s, NOW(), %s, %s, %s)
-                    """,
-                    (user_id, article_id, rank, 1.0 / rank, batch_id, algorithm_version, session_id)
-                )
-            except MySQLdb.Error as e:
-                if "1062" in str(e):
-                    logger.debug(f"Recommendation already exists for user {user_id}, article {article_id}. Skipping.")
-                else:
-                    raise e
+        # 같은 알고리즘의 최신 추천 묶음과 순서까지 동일하면 다시 쓰지 않음
+        cur.execute("""
+            SELECT article_id FROM recommended_articles
+            WHERE user_id = %s AND recommendation_algorithm_version = %s
+              AND recommended_at = (
+                  SELECT MAX(recommended_at) FROM recommended_articles
+                  WHERE user_id = %s AND recommendation_algorithm_version = %s
+              )
+            ORDER BY recommendation_rank
+        """, (user_id, algorithm_version, user_id, algorithm_version))
+        if [row['article_id'] for row in cur.fetchall()] == list(article_ids):
+            logger.debug(f"Recommendations unchanged for user {user_id}, algorithm={algorithm_version}. Skipping store.")
+            return
+
+        # 한 번의 multi-row INSERT로 저장 (같은 시각 중복 추천은 기존 행 유지)
+        rows = [(user_id, article_id, rank, 1.0 / rank, batch_id, algorithm_version, session_id)
+                for rank, article_id in enumerate(article_ids, 1)]
+        cur.executemany(
+            """
+            INSERT INTO recommended_articles 
+            (user_id, article_id, recommendation_rank, recommendation_score, recommended_at, batch_id, recommendation_algorithm_version, recommendation_session_id)
+            VALUES (%s, %s, %s, %s, NOW(), %s, %s, %s)
+            ON DUPLICATE KEY UPDATE recommendation_rank = recommendation_rank
+            """,
+            rows
+        )
         conn.commit()
         logger.info(f"Stored {len(article_ids)} recommendations for user {user_id}, batch_id={batch_id}, session_id={session_id}")
     except MySQLdb.Error as e:
@@ -94,17 +517,34 @@ def store_recommendations(user_id, article_ids, batch_id=None, algorithm_version
         if cur:
             cur.close()
 
-def get_recommended_articles(user_id):
+def get_recommended_articles(user_id, algorithm_version=None, top_n=10):
+    cur = None
     try:
-        cur = mysql.connection.cursor()
-        cur.execute("""
-            SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
-            FROM recommended_articles ra
-            JOIN articles a ON ra.article_id = a.id
-            WHERE ra.user_id = %s
-            ORDER BY ra.recommendation_rank
-            LIMIT 10
-        """, (user_id,))
+        cur = get_db().cursor()
+        if algorithm_version is None:
+            cur.execute("""
+                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
+                FROM recommended_articles ra
+                JOIN articles a ON ra.article_id = a.id
+                WHERE ra.user_id = %s
+                ORDER BY ra.recommendation_rank
+                LIMIT %s
+            """, (user_id, top_n))
+        else:
+            # 해당 알고리즘으로 가장 최근에 저장된 추천 묶음만 조회
+            cur.execute("""
+                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
+                FROM recommended_articles ra
+                JOIN articles a ON ra.article_id = a.id
+                WHERE ra.user_id = %s
+                  AND ra.recommendation_algorithm_version = %s
+                  AND ra.recommended_at = (
+                      SELECT MAX(recommended_at) FROM recommended_articles
+                      WHERE user_id = %s AND recommendation_algorithm_version = %s
+                  )
+                ORDER BY ra.recommendation_rank
+                LIMIT %s
+            """, (user_id, algorithm_version, user_id, algorithm_version, top_n))
         articles = cur.fetchall()
         logger.debug(f"Retrieved {len(articles)} recommendations for user {user_id}")
         return articles
@@ -115,138 +555,123 @@ def get_recommended_articles(user_id):
         if cur:
             cur.close()
 
-def get_keyword_recommendations(user_id, user_article_log=None, user_feedback=None, top_n=10, batch_id=None):
+def get_keyword_recommendations(user_id, top_n=10, batch_id=None):
+    cache_field = f"keyword:{top_n}"
+    articles = get_cached_recommendations(user_id, cache_field)
+    if articles is not None:
+        logger.debug(f"Keyword recommendations for user {user_id} served from cache")
+        return articles
+    articles = _compute_keyword_recommendations(user_id, top_n)
+    cache_recommendations(user_id, cache_field, articles)
+    return articles
+
+# 키워드 가중치 추출용 난수 생성기 (PCG64 Generator, 프로세스당 하나)
+keyword_rng = np.random.default_rng()
+
+def _compute_keyword_recommendations(user_id, top_n):
+    conn = None
     cur = None
     try:
-        cur = mysql.connection.cursor()
+        conn = get_db()
+        cur = conn.cursor()
+        # 조회만 하므로 읽기 전용 트랜잭션으로 실행 (트랜잭션 ID 할당/잠금 관리 생략)
+        cur.execute("START TRANSACTION READ ONLY")
 
-        if user_article_log is None:
-            cur.execute("SELECT article_id FROM user_article_log WHERE user_id = %s", (user_id,))
-            user_article_log = [row['article_id'] for row in cur.fetchall()]
-        
-        if user_feedback is None:
-            cur.execute("SELECT article_id, feedback_type FROM user_feedback WHERE user_id = %s", (user_id,))
-            user_feedback = [(row['article_id'], row['feedback_type']) for row in cur.fetchall()]
-        
-        cur.execute("SELECT search_term, COUNT(*) as frequency FROM user_searches WHERE user_id = %s GROUP BY search_term ORDER BY frequency DESC LIMIT 5", (user_id,))
-        search_keywords = [(row['search_term'], row['frequency']) for row in cur.fetchall()]
-        
-        search_count = len(search_keywords)
-        action_count = len(user_article_log)
+        # 검색어(빈도) / 행동 로그(건당 0.5) / 피드백(타입별 가중치) 키워드 가중치를 한 번의 쿼리로 합산
+        cur.execute("""
+            SELECT t.keyword, SUM(t.weight) AS weight,
+                   (SELECT COUNT(*) FROM (SELECT DISTINCT search_term FROM user_searches WHERE user_id = %s LIMIT 3) s) AS search_count,
+                   (SELECT COUNT(*) FROM (SELECT 1 FROM user_article_log WHERE user_id = %s LIMIT 3) l) AS action_count
+            FROM (
+                (SELECT search_term AS keyword, COUNT(*) AS weight
+                 FROM user_searches
+                 WHERE user_id = %s
+                 GROUP BY search_term
+                 ORDER BY weight DESC
+                 LIMIT 5)
+                UNION ALL
+                (SELECT k.keyword_text AS keyword, COUNT(*) * 0.5 AS weight
+                 FROM user_article_log ual
+                 JOIN article_keywords ak ON ual.article_id = ak.article_id
+                 JOIN keywords k ON ak.keyword_id = k.id
+                 WHERE ual.user_id = %s
+                 GROUP BY k.keyword_text)
+                UNION ALL
+                (SELECT k.keyword_text AS keyword,
+                        SUM(CASE uf.feedback_type
+                                WHEN 'like' THEN 2.0
+                                WHEN 'dislike' THEN -2.0
+                                WHEN 'read' THEN 1.0
+                                WHEN 'click_external_link' THEN 1.5
+                                ELSE 0 END) AS weight
+                 FROM user_feedback uf
+                 JOIN article_keywords ak ON uf.article_id = ak.article_id
+                 JOIN keywords k ON ak.keyword_id = k.id
+                 WHERE uf.user_id = %s
+                 GROUP BY k.keyword_text)
+            ) t
+            GROUP BY t.keyword
+            HAVING weight > 0
+            ORDER BY weight DESC
+            LIMIT 5
+        """, (user_id, user_id, user_id, user_id, user_id))
+        rows = cur.fetchall()
+
+        # 검색어/행동 수는 임계값(3)까지만 센다. 양수 가중치 키워드가 없으면 rows가 비어 데이터 부족 폴백으로 처리
+        search_count = rows[0]['search_count'] if rows else 0
+        action_count = rows[0]['action_count'] if rows else 0
         logger.debug(f"User {user_id}: searches={search_count}, actions={action_count}")
 
         if search_count < 3 and action_count < 3:
-            logger.debug(f"Insufficient data for user {user_id}, returning popular articles (keyword fallback)")
-            cur.execute(f"""
-                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
-                FROM articles a
-                LEFT JOIN user_article_log ual ON a.id = ual.article_id
-                GROUP BY a.id
-                ORDER BY COUNT(ual.id) DESC, a.published_at DESC
-                LIMIT {top_n}
-            """)  # description -> summary
-            articles = cur.fetchall()
+            logger.debug(f"Insufficient data or no positive keywords for user {user_id}, returning popular articles (keyword fallback)")
+            articles = get_popular_articles(top_n)
+            conn.commit()
             logger.debug(f"Popular articles returned by keyword fallback: {len(articles)}")
             return articles
 
-        action_keywords_temp = {}
-        for article_id_log in user_article_log:
-            cur.execute("""
-                SELECT k.keyword_text
-                FROM article_keywords ak
-                JOIN keywords k ON ak.keyword_id = k.id
-                WHERE ak.article_id = %s
-            """, (article_id_log,))
-            for row in cur.fetchall():
-                action_keywords_temp[row['keyword_text']] = action_keywords_temp.get(row['keyword_text'], 0) + 0.5
-
-        action_keywords = [(k, v) for k, v in action_keywords_temp.items()]
-        logger.debug(f"Action keywords: {action_keywords}")
-
-        feedback_keywords_temp = {}
-        for article_id_fb, feedback_type_fb in user_feedback:
-            cur.execute("""
-                SELECT k.keyword_text
-                FROM article_keywords ak
-                JOIN keywords k ON ak.keyword_id = k.id
-                WHERE ak.article_id = %s
-            """, (article_id_fb,))
-            for row in cur.fetchall():
-                weight = 0
-                if feedback_type_fb == 'like':
-                    weight = 2.0
-                elif feedback_type_fb == 'dislike':
-                    weight = -2.0
-                elif feedback_type_fb == 'read':
-                    weight = 1.0
-                elif feedback_type_fb == 'click_external_link':
-                    weight = 1.5
-                feedback_keywords_temp[row['keyword_text']] = feedback_keywords_temp.get(row['keyword_text'], 0) + weight
-        feedback_keywords = [(k, v) for k, v in feedback_keywords_temp.items()]
-        logger.debug(f"Feedback keywords count: {len(feedback_keywords)}")
-
-        keyword_weights = {}
-        for keyword, weight in search_keywords:
-            keyword_weights[keyword] = keyword_weights.get(keyword, 0) + weight
-        for keyword, weight in action_keywords:
-            keyword_weights[keyword] = keyword_weights.get(keyword, 0) + weight
-        for keyword, weight in feedback_keywords:
-            keyword_weights[keyword] = keyword_weights.get(keyword, 0) + weight
-
-        keywords = sorted([(k, w) for k, w in keyword_weights.items() if w > 0], key=lambda x: x[1], reverse=True)[:5]
+        keywords = [(row['keyword'], float(row['weight'])) for row in rows]
         logger.debug(f"Final keywords: {keywords}")
 
-        if not keywords:
-            logger.debug(f"No positive keywords, returning popular articles (keyword fallback)")
-            cur.execute(f"""
-                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
-                FROM articles a
-                LEFT JOIN user_article_log ual ON a.id = ual.article_id
-                GROUP BY a.id
-                ORDER BY COUNT(ual.id) DESC, a.published_at DESC
-                LIMIT {top_n}
-            """)  # description -> summary
-            articles = cur.fetchall()
-            logger.debug(f"Popular articles returned by keyword fallback: {len(articles)}")
-            return articles
-
-        selected_keywords = random.choices([k for k, w in keywords], weights=[w for k, w in keywords], k=min(len(keywords), 3))
+        # 가중치 비례 비복원 추출로 서로 다른 키워드 최대 3개 선택
+        keyword_texts = [k for k, w in keywords]
+        keyword_weights = np.array([w for k, w in keywords])
+        selected_keywords = keyword_rng.choice(keyword_texts, size=min(len(keywords), 3), replace=False,
+                                               p=keyword_weights / keyword_weights.sum()).tolist()
         
-        cur.execute("SELECT article_id FROM user_feedback WHERE user_id = %s AND feedback_type = 'dislike'", (user_id,))
-        disliked_article_ids = [row['article_id'] for row in cur.fetchall()]
-
-        recommended_articles = []
-        seen_ids = set()
-        disliked_ids_str = ','.join(map(str, disliked_article_ids)) if disliked_article_ids else 'NULL'
-
-        for keyword in selected_keywords:
-            if len(recommended_articles) >= top_n:
-                break
-            limit_per_keyword = max(1, top_n // len(selected_keywords)) + 2
-            cur.execute(f"""
-                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
-                FROM articles a
-                JOIN article_keywords ak ON a.id = ak.article_id
-                JOIN keywords k ON ak.keyword_id = k.id
-                WHERE k.keyword_text = %s 
-                  AND a.id NOT IN ({disliked_ids_str})
-                ORDER BY a.published_at DESC
-                LIMIT %s
-            """, (keyword, limit_per_keyword))  # description -> summary
-            articles = cur.fetchall()
-            for article in articles:
-                if article['id'] not in seen_ids:
-                    recommended_articles.append(article)
-                    seen_ids.add(article['id'])
-                if len(recommended_articles) >= top_n:
-                    break
-
-        unique_articles = recommended_articles[:top_n]
+        # 키워드별 최신 기사 상위 N개를 ROW_NUMBER()로 한 번에 조회 (싫어요 기사는 anti-join으로 제외)
+        # 여러 키워드에 걸친 기사는 GROUP BY로 합치고, (키워드 선택 순서, 키워드 내 순위)가 가장 앞선 위치로 정렬
+        limit_per_keyword = max(1, top_n // len(selected_keywords)) + 2
+        keyword_placeholders = ','.join(['%s'] * len(selected_keywords))
+        cur.execute(f"""
+            SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
+            FROM (
+                SELECT ranked.id, MIN(FIELD(ranked.keyword_text, {keyword_placeholders}) * %s + ranked.rn) AS first_seen
+                FROM (
+                    SELECT a.id, k.keyword_text,
+                           ROW_NUMBER() OVER (PARTITION BY k.keyword_text ORDER BY a.published_at DESC) AS rn
+                    FROM articles a
+                    JOIN article_keywords ak ON a.id = ak.article_id
+                    JOIN keywords k ON ak.keyword_id = k.id
+                    LEFT JOIN user_feedback uf
+                      ON uf.article_id = a.id AND uf.user_id = %s AND uf.feedback_type = 'dislike'
+                    WHERE k.keyword_text IN ({keyword_placeholders})
+                      AND uf.article_id IS NULL
+                ) ranked
+                WHERE ranked.rn <= %s
+                GROUP BY ranked.id
+            ) picked
+            JOIN articles a ON a.id = picked.id
+            ORDER BY picked.first_seen
+            LIMIT %s
+        """, selected_keywords + [limit_per_keyword + 1, user_id] + selected_keywords + [limit_per_keyword, top_n])  # description -> summary
+        unique_articles = list(cur.fetchall())
+        conn.commit()
         logger.debug(f"Keyword recommendations generated: {len(unique_articles)}")
         logger.info(f"Keyword recommendations for user {user_id}: {len(unique_articles)} articles")
         return unique_articles
     except MySQLdb.Error as e:
         logger.error(f"Error getting keyword recommendations for user {user_id}: {str(e)}", exc_info=True)
+        rollback_quietly(conn)
         return []
     finally:
         if cur:
@@ -263,61 +688,24 @@ def get_svd_recommendations(user_id, top_n=10, batch_id=None):
 
     cur = None
     try:
-        cur = mysql.connection.cursor()
-
-        cur.execute("""
-            SELECT article_id FROM user_article_log WHERE user_id = %s
-            UNION
-            SELECT article_id FROM user_feedback WHERE user_id = %s
-            UNION
-            SELECT article_id FROM recommended_articles WHERE user_id = %s
-        """, (user_id, user_id, user_id))
-        interacted_article_ids = {row['article_id'] for row in cur.fetchall()}
-        logger.debug(f"User {user_id} has interacted with {len(interacted_article_ids)} articles.")
-
-        cur.execute("SELECT id FROM articles")
-        all_article_ids = {row['id'] for row in cur.fetchall()}
-        logger.debug(f"Total articles in DB: {len(all_article_ids)}")
+        cur = get_db().cursor()
 
-        candidate_article_ids = list(all_article_ids - interacted_article_ids)
+        candidate_article_ids = get_unseen_article_ids(cur, user_id)
         if not candidate_article_ids:
             logger.warning(f"No unseen articles for user {user_id} for SVD. Returning popular articles.")
-            cur.execute(f"""
-                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
-                FROM articles a
-                LEFT JOIN user_article_log ual ON a.id = ual.article_id
-                GROUP BY a.id
-                ORDER BY COUNT(ual.id) DESC, a.published_at DESC
-                LIMIT {top_n}
-            """)  # description -> summary
-            articles = cur.fetchall()
-            return articles
+            return get_popular_articles(top_n)
             
         logger.debug(f"Candidate articles for user {user_id}: {len(candidate_article_ids)}")
 
-        predictions = []
-        for article_id in candidate_article_ids:
-            _, _, _, estimated_rating, _ = svd_model.predict(user_id, article_id, r_ui=None)
-            predictions.append((article_id, estimated_rating))
-
-        predictions.sort(key=lambda x: x[1], reverse=True)
-        top_recommendations = predictions[:top_n]
+        scores = score_svd_candidates(svd_model, user_id, candidate_article_ids)
+        k = min(top_n, len(candidate_article_ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top_recommendations = [(candidate_article_ids[i], float(scores[i])) for i in top]
         recommended_article_ids = [item[0] for item in top_recommendations]
         
         if recommended_article_ids:
-            placeholders = ','.join(['%s'] * len(recommended_article_ids))
-            cur.execute(f"""
-                SELECT id, title, summary, category, published_at, url
-                FROM articles
-                WHERE id IN ({placeholders})
-                ORDER BY FIELD(id, {placeholders})
-            """, recommended_article_ids + recommended_article_ids)  # description -> summary
-            articles = cur.fetchall()
-            final_ordered_articles = []
-            article_map = {article['id']: article for article in articles}
-            for article_id in recommended_article_ids:
-                if article_id in article_map:
-                    final_ordered_articles.append(article_map[article_id])
+            final_ordered_articles = get_articles_by_ids(cur, recommended_article_ids)
             logger.debug(f"SVD raw recommended article IDs for user {user_id}: {[rec[0] for rec in top_recommendations]}")
             logger.debug(f"SVD final ordered article IDs for user {user_id}: {[art['id'] for art in final_ordered_articles]}")
             logger.info(f"SVD recommendations for user {user_id}: {len(final_ordered_articles)} articles")
@@ -344,97 +732,242 @@ def get_bpr_recommendations(user_id, top_n=10, batch_id=None):
 
     cur = None
     try:
-        cur = mysql.connection.cursor()
-
-        cur.execute("""
-            SELECT article_id FROM user_article_log WHERE user_id = %s
-            UNION
-            SELECT article_id FROM user_feedback WHERE user_id = %s
-            UNION
-            SELECT article_id FROM recommended_articles WHERE user_id = %s
-        """, (user_id, user_id, user_id))
-        interacted_article_ids = {row['article_id'] for row in cur.fetchall()}
-        logger.debug(f"User {user_id} has interacted with {len(interacted_article_ids)} articles.")
+        cur = get_db().cursor()
 
-        cur.execute("SELECT id FROM articles")
-        all_article_ids = {row['id'] for row in cur.fetchall()}
-        logger.debug(f"Total articles in DB: {len(all_article_ids)}")
+        if not bpr_model.knows_user(user_id):
+            logger.warning(f"Unknown user {user_id} for BPR. Returning popular articles.")
+            return get_popular_articles(top_n)
 
-        candidate_article_ids = list(all_article_ids - interacted_article_ids)
-        if not candidate_article_ids:
+        interacted_article_ids = get_interacted_article_ids(cur, user_id)
+        recommended_article_ids = bpr_model.recommend_excluding(user_id, interacted_article_ids, top_n)
+        if not recommended_article_ids:
             logger.warning(f"No unseen articles for user {user_id} for BPR. Returning popular articles.")
-            cur.execute(f"""
-                SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
-                FROM articles a
-                LEFT JOIN user_article_log ual ON a.id = ual.article_id
-                GROUP BY a.id
-                ORDER BY COUNT(ual.id) DESC, a.published_at DESC
-                LIMIT {top_n}
-            """)
-            articles = cur.fetchall()
-            return articles
+            return get_popular_articles(top_n)
 
-        logger.debug(f"Candidate articles for user {user_id}: {len(candidate_article_ids)}")
+        final_ordered_articles = get_articles_by_ids(cur, recommended_article_ids)
+        logger.debug(f"BPR raw recommended article IDs for user {user_id}: {recommended_article_ids}")
+        logger.debug(f"BPR final ordered article IDs for user {user_id}: {[art['id'] for art in final_ordered_articles]}")
+        logger.info(f"BPR recommendations for user {user_id}: {len(final_ordered_articles)} articles")
+        return final_ordered_articles
 
-        predictions = []
-        for article_id in candidate_article_ids:
-            _, _, _, est_rating, _ = bpr_model.predict(str(user_id), str(article_id))
-            predictions.append((article_id, est_rating))
+    except Exception as e:
+        logger.error(f"Error getting BPR recommendations for user {user_id}: {str(e)}", exc_info=True)
+        return []
+    finally:
+        if cur:
+            cur.close()
 
-        predictions.sort(key=lambda x: x[1], reverse=True)
-        recommended_article_ids = [item[0] for item in predictions[:top_n]]
+# 여러 사용자의 BPR 추천을 한 번에 생성 (평가 등 일괄 처리용, 사용자 id → 기사 목록)
+def get_bpr_recommendations_batch(user_ids, top_n=10):
+    global bpr_model
+    if bpr_model is None:
+        logger.warning("BPR model is not loaded. Attempting to reload...")
+        bpr_model = load_bpr_model()
+        if bpr_model is None:
+            logger.error("Failed to load BPR model. Cannot provide batch BPR recommendations.")
+            return {user_id: [] for user_id in user_ids}
 
-        if recommended_article_ids:
-            placeholders = ','.join(['%s'] * len(recommended_article_ids))
-            cur.execute(f"""
-                SELECT id, title, summary, category, published_at, url
-                FROM articles
-                WHERE id IN ({placeholders})
-                ORDER BY FIELD(id, {placeholders})
-            """, recommended_article_ids + recommended_article_ids)
-            articles = cur.fetchall()
-            final_ordered_articles = []
-            article_map = {article['id']: article for article in articles}
-            for article_id in recommended_article_ids:
-                if article_id in article_map:
-                    final_ordered_articles.append(article_map[article_id])
-            logger.debug(f"BPR raw recommended article IDs for user {user_id}: {recommended_article_ids}")
-            logger.debug(f"BPR final ordered article IDs for user {user_id}: {[art['id'] for art in final_ordered_articles]}")
-            logger.info(f"BPR recommendations for user {user_id}: {len(final_ordered_articles)} articles")
-            return final_ordered_articles
-        else:
-            logger.warning(f"BPR model produced no recommendations for user {user_id}.")
-            return []
+    cur = None
+    try:
+        cur = get_db().cursor()
+        known_user_ids = [user_id for user_id in user_ids if bpr_model.knows_user(user_id)]
+        interacted_by_user = get_interacted_article_ids_batch(cur, known_user_ids)
+        recommended_by_user = bpr_model.recommend_excluding_batch(known_user_ids, interacted_by_user, top_n)
+
+        # 기사 정보는 전체 사용자의 추천 기사를 합쳐 한 번에 채운 뒤 사용자별 순서대로 꺼냄
+        all_recommended_ids = list(dict.fromkeys(article_id for ids in recommended_by_user.values() for article_id in ids))
+        articles_by_id = {article['id']: article for article in get_articles_by_ids(cur, all_recommended_ids)}
+
+        recommendations = {}
+        for user_id in user_ids:
+            recommended_article_ids = recommended_by_user.get(user_id)
+            if not recommended_article_ids:
+                logger.warning(f"No BPR recommendations for user {user_id} (unknown user or no unseen articles). Returning popular articles.")
+                recommendations[user_id] = get_popular_articles(top_n)
+                continue
+            recommendations[user_id] = [articles_by_id[article_id] for article_id in recommended_article_ids if article_id in articles_by_id]
+        logger.info(f"Batch BPR recommendations generated for {len(user_ids)} users")
+        return recommendations
 
     except Exception as e:
-        logger.error(f"Error getting BPR recommendations for user {user_id}: {str(e)}", exc_info=True)
-        return []
+        logger.error(f"Error getting batch BPR recommendations: {str(e)}", exc_info=True)
+        return {user_id: [] for user_id in user_ids}
     finally:
         if cur:
             cur.close()
 
-def log_user_action(user_id, article_id, action_type, read_time=None, scroll_depth=None):
-    logger.debug(f"Logging action: user_id={user_id}, article_id={article_id}, action_type={action_type}")
+# 사용자 행동 로그는 큐에 쌓아두고 전용 스레드가 executemany로 묶어서 한 번에 커밋
+ACTION_LOG_BATCH_SIZE = 500
+ACTION_LOG_FLUSH_INTERVAL = 0.2
+action_log_queue = queue.Queue()
+_ACTION_LOG_STOP = object()
+# user_article_log.action_type ENUM 값 (그 외 값은 배치 INSERT 전체를 실패시키므로 큐에 넣지 않음)
+ACTION_LOG_TYPES = frozenset(('view', 'click_external_link', 'read'))
+
+def _write_action_logs(conn, batch):
+    simple_rows = [row[:3] for row in batch if row[3] is None and row[4] is None]
+    detailed_rows = [row for row in batch if row[3] is not None or row[4] is not None]
+    cur = conn.cursor()
     try:
-        cur = mysql.connection.cursor()
-        if read_time is not None or scroll_depth is not None:
-            cur.execute("""
+        if simple_rows:
+            cur.executemany("""
+                INSERT INTO user_article_log (user_id, article_id, action_type)
+                VALUES (%s, %s, %s)
+            """, simple_rows)
+        if detailed_rows:
+            cur.executemany("""
                 INSERT INTO user_article_log (user_id, article_id, action_type, read_time, scroll_depth)
                 VALUES (%s, %s, %s, %s, %s)
-            """, (user_id, article_id, action_type, read_time, scroll_depth))
+            """, detailed_rows)
+        conn.commit()
+    finally:
+        cur.close()
+
+def _action_log_writer():
+    running = True
+    while running:
+        # 첫 항목이 들어온 뒤 최대 FLUSH_INTERVAL 동안 또는 BATCH_SIZE까지 모아서 기록
+        batch = []
+        item = action_log_queue.get()
+        deadline = time.monotonic() + ACTION_LOG_FLUSH_INTERVAL
+        while True:
+            if item is _ACTION_LOG_STOP:
+                running = False
+                break
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= ACTION_LOG_BATCH_SIZE or remaining <= 0:
+                break
+            try:
+                item = action_log_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        if not batch:
+            continue
+        conn = None
+        try:
+            conn = db_pool.connection()
+            try:
+                _write_action_logs(conn, batch)
+            except MySQLdb.Error as e:
+                # 배치 실패 시 롤백하고 한 건씩 다시 기록 (문제 있는 행만 버림)
+                conn.rollback()
+                logger.warning(f"Batch flush of {len(batch)} actions failed ({str(e)}); retrying rows individually")
+                for row in batch:
+                    try:
+                        _write_action_logs(conn, [row])
+                    except MySQLdb.Error as row_error:
+                        conn.rollback()
+                        logger.error(f"Dropping action {row}: {str(row_error)}")
+            logger.debug(f"Flushed {len(batch)} actions")
+        except MySQLdb.Error as e:
+            logger.error(f"Error flushing {len(batch)} actions: {str(e)}", exc_info=True)
+        finally:
+            if conn:
+                conn.close()
+
+action_log_thread = threading.Thread(target=_action_log_writer, name='action-log-writer', daemon=True)
+action_log_thread.start()
+
+@atexit.register
+def _flush_action_logs():
+    action_log_queue.put(_ACTION_LOG_STOP)
+    action_log_thread.join(timeout=5)
+
+def log_user_action(user_id, article_id, action_type, read_time=None, scroll_depth=None):
+    if action_type not in ACTION_LOG_TYPES:
+        logger.warning(f"Ignoring unknown action_type {action_type!r} for user {user_id}, article {article_id}")
+        return False
+    logger.debug(f"Logging action: user_id={user_id}, article_id={article_id}, action_type={action_type}")
+    action_log_queue.put((user_id, article_id, action_type, read_time, scroll_depth))
+    return True
+
+# 알고리즘별 추천 생성 함수 (버전, 배치 ID, 생성 함수)
+RECOMMENDERS = [
+    ('keyword_v1', 'keyword_batch_20250615', get_keyword_recommendations),
+    ('svd_v1', 'svd_batch_20250615', get_svd_recommendations),
+    ('bpr_v1', 'bpr_batch_20250615', get_bpr_recommendations),
+]
+
+def refresh_recommendations(user_id, algorithm_version, batch_id, recommend, top_n=10, store_async=False):
+    articles = recommend(user_id, top_n=top_n, batch_id=batch_id)
+    if articles:
+        article_ids = [article['id'] for article in articles]
+        if store_async:
+            submit_recommendation_store(user_id, article_ids, batch_id, algorithm_version)
         else:
-            cur.execute("""
-                INSERT INTO user_article_log (user_id, article_id, action_type)
-                VALUES (%s, %s, %s)
-            """, (user_id, article_id, action_type))
-        mysql.connection.commit()
-        logger.debug(f"Action logged: {action_type}")
-    except MySQLdb.Error as e:
-        mysql.connection.rollback()
-        logger.error(f"Error logging action: {str(e)}", exc_info=True)
+            store_recommendations(user_id, article_ids, batch_id=batch_id, algorithm_version=algorithm_version)
+    return articles
+
+# 요청 처리 중 생성한 추천의 저장(커밋)은 응답을 막지 않도록 백그라운드 스레드에서 처리
+# 대기 작업이 너무 많으면 새 저장은 버림 (다음 방문 시 다시 생성되어 저장됨)
+RECOMMENDATION_STORE_MAX_PENDING = 200
+recommendation_store_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='recommendation-store')
+_recommendation_store_slots = threading.BoundedSemaphore(RECOMMENDATION_STORE_MAX_PENDING)
+
+def submit_recommendation_store(user_id, article_ids, batch_id, algorithm_version):
+    if not _recommendation_store_slots.acquire(blocking=False):
+        logger.warning(f"Recommendation store queue full; dropping {algorithm_version} batch for user {user_id}")
+        return
+    recommendation_store_executor.submit(_store_recommendations_in_background, user_id, article_ids, batch_id, algorithm_version)
+
+def _store_recommendations_in_background(user_id, article_ids, batch_id, algorithm_version):
+    try:
+        with app.app_context():
+            store_recommendations(user_id, article_ids, batch_id=batch_id, algorithm_version=algorithm_version)
+    except Exception as e:
+        logger.error(f"Background recommendation store failed for user {user_id}: {str(e)}", exc_info=True)
     finally:
-        if cur:
-            cur.close()
+        _recommendation_store_slots.release()
+
+# 피드백/행동 이벤트 후 추천을 백그라운드에서 다시 생성 (같은 사용자의 연속 이벤트는 한 번으로 합침)
+RECOMMENDATION_REBUILD_DELAY = 5
+recommendation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='recommendation-rebuild')
+_pending_rebuilds = set()
+_pending_rebuilds_lock = threading.Lock()
+
+def schedule_recommendation_rebuild(user_id):
+    with _pending_rebuilds_lock:
+        if user_id in _pending_rebuilds:
+            return
+        _pending_rebuilds.add(user_id)
+    if redis_client is not None:
+        try:
+            # 여러 워커 프로세스 간에도 중복 재생성을 막기 위한 debounce 키
+            if not redis_client.set(f"rec:{user_id}:rebuild", 1, nx=True, ex=RECOMMENDATION_REBUILD_DELAY):
+                with _pending_rebuilds_lock:
+                    _pending_rebuilds.discard(user_id)
+                return
+        except redis.RedisError as e:
+            logger.warning(f"Rebuild debounce check failed for user {user_id}: {str(e)}")
+    timer = threading.Timer(RECOMMENDATION_REBUILD_DELAY, recommendation_executor.submit, args=(rebuild_recommendations, user_id))
+    timer.daemon = True
+    timer.start()
+
+def rebuild_recommendations(user_id):
+    with _pending_rebuilds_lock:
+        _pending_rebuilds.discard(user_id)
+    try:
+        with app.app_context():
+            invalidate_recommendations(user_id)
+            for algorithm_version, batch_id, recommend in RECOMMENDERS:
+                refresh_recommendations(user_id, algorithm_version, batch_id, recommend)
+            # 재생성 도중 이전 추천으로 캐시된 홈 화면을 버림
+            invalidate_recommendations(user_id)
+        logger.info(f"Rebuilt recommendations for user {user_id}")
+    except Exception as e:
+        logger.error(f"Error rebuilding recommendations for user {user_id}: {str(e)}", exc_info=True)
+
+# /home 요청 시 알고리즘별 추천 조회용 스레드 풀 (스레드마다 별도 app context와 풀 커넥션 사용)
+home_recommendation_executor = ThreadPoolExecutor(max_workers=len(RECOMMENDERS) * 4, thread_name_prefix='recommendation-home')
+
+def load_recommendations(user_id, algorithm_version, batch_id, recommend):
+    # 저장된 최신 추천을 바로 보여주고, 아직 없으면 동기적으로 생성
+    with app.app_context():
+        articles = get_recommended_articles(user_id, algorithm_version=algorithm_version)
+        if not articles:
+            articles = refresh_recommendations(user_id, algorithm_version, batch_id, recommend, store_async=True)
+        return articles
 
 @app.route('/')
 def home():
@@ -442,23 +975,31 @@ def home():
         return redirect(url_for('login'))
     user_id = session['user_id']
     username = session.get('username', '사용자')
-    
-    keyword_articles = get_keyword_recommendations(user_id, top_n=10, batch_id='keyword_batch_20250615')
-    svd_articles = get_svd_recommendations(user_id, top_n=10, batch_id='svd_batch_20250615')
-    bpr_articles = get_bpr_recommendations(user_id, top_n=10, batch_id='bpr_batch_20250615')
-    
-    if keyword_articles:
-        keyword_article_ids = [article['id'] for article in keyword_articles]
-        store_recommendations(user_id, keyword_article_ids, batch_id='keyword_batch_20250615', algorithm_version='keyword_v1')
-    if svd_articles:
-        svd_article_ids = [article['id'] for article in svd_articles]
-        store_recommendations(user_id, svd_article_ids, batch_id='svd_batch_20250615', algorithm_version='svd_v1')
-    if bpr_articles:
-        bpr_article_ids = [article['id'] for article in bpr_articles]
-        store_recommendations(user_id, bpr_article_ids, batch_id='bpr_batch_20250615', algorithm_version='bpr_v1')
-
-    return render_template('home.html', username=username, articles=[],
+
+    # 렌더링된 홈 화면은 추천 캐시 해시에 함께 저장 (피드백/행동/검색 시 추천과 같이 무효화됨)
+    # 표시할 flash 메시지가 있으면 캐시를 쓰지도 저장하지도 않음
+    use_page_cache = '_flashes' not in session
+    if use_page_cache:
+        page = get_cached_page(user_id, 'home')
+        if page is not None:
+            logger.debug(f"Home page for user {user_id} served from cache")
+            return page
+
+    # 알고리즘별 추천을 스레드 풀에서 동시에 조회/생성 (응답 시간 = 가장 느린 알고리즘)
+    futures = {
+        algorithm_version: home_recommendation_executor.submit(load_recommendations, user_id, algorithm_version, batch_id, recommend)
+        for algorithm_version, batch_id, recommend in RECOMMENDERS
+    }
+    recommendations = {algorithm_version: future.result() for algorithm_version, future in futures.items()}
+    keyword_articles = recommendations['keyword_v1']
+    svd_articles = recommendations['svd_v1']
+    bpr_articles = recommendations['bpr_v1']
+
+    page = render_template('home.html', username=username, articles=[],
                            keyword_articles=keyword_articles, svd_articles=svd_articles, bpr_articles=bpr_articles)
+    if use_page_cache:
+        cache_page(user_id, 'home', page)
+    return page
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -466,22 +1007,26 @@ def register():
         email = request.form['email']
         username = request.form['username']
         password = request.form['password']
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        cur = None
         try:
-            cur = mysql.connection.cursor()
+            password_hash = password_pool.submit(_hash_password, password).result(timeout=PASSWORD_TIMEOUT)
+            cur = get_db().cursor()
             cur.execute(
                 "INSERT INTO users (email, username, password_hash) VALUES (%s, %s, %s)",
                 (email, username, password_hash)
             )
-            mysql.connection.commit()
+            get_db().commit()
             flash('회원가입 성공! 로그인해주세요.', 'success')
             return redirect(url_for('login'))
         except MySQLdb.IntegrityError:
-            mysql.connection.rollback()
+            get_db().rollback()
             flash('이메일이 이미 존재합니다.', 'error')
         except MySQLdb.Error as e:
-            mysql.connection.rollback()
+            get_db().rollback()
             flash(f'DB 연결 오류: {str(e)}', 'error')
+        except FuturesTimeoutError:
+            logger.error("Password hashing timed out during registration")
+            flash('요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.', 'error')
         finally:
             if cur:
                 cur.close()
@@ -492,11 +1037,19 @@ def login():
     if request.method == 'POST':
         email = request.form['email']
         password = request.form['password']
+        cur = None
         try:
-            cur = mysql.connection.cursor()
+            cur = get_db().cursor()
             cur.execute("SELECT id, username, password_hash FROM users WHERE email = %s", [email])
             user = cur.fetchone()
-            if user and bcrypt.check_password_hash(user['password_hash'], password):
+            password_hash = user['password_hash'] if user else DUMMY_PASSWORD_HASH
+            password_ok, needs_rehash = password_pool.submit(_check_password, password_hash, password).result(timeout=PASSWORD_TIMEOUT)
+            if user and password_ok:
+                if needs_rehash:
+                    new_password_hash = password_pool.submit(_hash_password, password).result(timeout=PASSWORD_TIMEOUT)
+                    cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_password_hash, user['id']))
+                    get_db().commit()
+                    logger.info(f"Password hash upgraded for user {user['id']}")
                 session['user_id'] = user['id']
                 session['username'] = user['username']
                 logger.debug(f"User logged in: id={user['id']}, username={user['username']}")
@@ -506,6 +1059,9 @@ def login():
                 flash('이메일 또는 비밀번호가 잘못되었습니다.', 'error')
         except MySQLdb.Error as e:
             flash(f'DB 연결 오류: {str(e)}', 'error')
+        except FuturesTimeoutError:
+            logger.error("Password check timed out during login")
+            flash('요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.', 'error')
         finally:
             if cur:
                 cur.close()
@@ -520,6 +1076,9 @@ def logout():
     flash('로그아웃되었습니다.', 'success')
     return redirect(url_for('login'))
 
+# MySQL ngram 파서의 토큰 길이 (ngram_token_size 기본값), 이보다 짧은 검색 단어는 FULLTEXT로 찾을 수 없음
+SEARCH_NGRAM_TOKEN_SIZE = 2
+
 @app.route('/search_news', methods=['GET'])
 def search_news():
     if 'user_id' not in session:
@@ -530,30 +1089,60 @@ def search_news():
     username = session.get('username', '사용자')
     if query:
         try:
-            cur = mysql.connection.cursor()
+            cur = get_db().cursor()
             cur.execute("INSERT INTO user_searches (user_id, search_term) VALUES (%s, %s)",
                         (session['user_id'], query))
-            mysql.connection.commit()
+            get_db().commit()
+            invalidate_recommendations(session['user_id'])
+            schedule_recommendation_rebuild(session['user_id'])
             logger.debug(f"Search query '{query}' logged for user {session['user_id']}")
 
-            search_term = f"%{query}%"
-            sql_query = """
-                SELECT DISTINCT
-                    a.id, a.title, a.summary, a.category, a.published_at, a.url
-                FROM articles a
-                LEFT JOIN article_keywords ak ON a.id = ak.article_id
-                LEFT JOIN keywords k ON ak.keyword_id = k.id
-                WHERE a.title LIKE %s
-                   OR a.summary LIKE %s
-                   OR k.keyword_text LIKE %s
-                ORDER BY a.published_at DESC
-                LIMIT 50
-            """  # description -> summary
-            cur.execute(sql_query, (search_term, search_term, search_term))
+            words = query.split()
+            if not words or min(len(word) for word in words) < SEARCH_NGRAM_TOKEN_SIZE:
+                # ngram 토큰보다 짧은 단어(1글자)는 FULLTEXT 인덱스로 찾을 수 없으므로 기존 LIKE 부분 일치로 조회
+                search_term = f"%{query}%"
+                sql_query = """
+                    SELECT DISTINCT
+                        a.id, a.title, a.summary, a.category, a.published_at, a.url
+                    FROM articles a
+                    LEFT JOIN article_keywords ak ON a.id = ak.article_id
+                    LEFT JOIN keywords k ON ak.keyword_id = k.id
+                    WHERE a.title LIKE %s
+                       OR a.summary LIKE %s
+                       OR k.keyword_text LIKE %s
+                    ORDER BY a.published_at DESC
+                    LIMIT 50
+                """
+                params = (search_term, search_term, search_term)
+            else:
+                # 제목/요약과 키워드 모두 FULLTEXT(ngram) 인덱스로 조회해 합침
+                # 인덱스는 stopword 없이 만들어야 'AI', 'IT' 같은 영문 검색어도 찾음 (schema/init_db.sql 참고)
+                # 검색어를 BOOLEAN MODE 구문("...")으로 넘기면 ngram 연속 일치 = 기존 LIKE '%검색어%'와 같은 부분 일치
+                search_phrase = '"' + query.replace('"', ' ') + '"'
+                sql_query = """
+                    SELECT id, title, summary, category, published_at, url
+                    FROM (
+                        SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
+                        FROM articles a
+                        WHERE MATCH(a.title, a.summary) AGAINST (%s IN BOOLEAN MODE)
+                        UNION
+                        SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url
+                        FROM keywords k
+                        JOIN article_keywords ak ON ak.keyword_id = k.id
+                        JOIN articles a ON a.id = ak.article_id
+                        WHERE MATCH(k.keyword_text) AGAINST (%s IN BOOLEAN MODE)
+                    ) results
+                    ORDER BY published_at DESC
+                    LIMIT 50
+                """  # description -> summary
+                params = (search_phrase, search_phrase)
+            cur.execute("START TRANSACTION READ ONLY")
+            cur.execute(sql_query, params)
             articles_results = cur.fetchall()
+            get_db().commit()
             logger.info(f"Search query '{query}' returned {len(articles_results)} results for user {session['user_id']}")
         except MySQLdb.Error as e:
-            mysql.connection.rollback()
+            rollback_quietly(get_db())
             flash(f"검색 중 오류 발생: {str(e)}", "error")
             logger.error(f"Search error for query '{query}': {str(e)}", exc_info=True)
             return render_template('home.html', articles=[], username=username,
@@ -572,8 +1161,14 @@ def article_detail(article_id):
         flash('로그인이 필요합니다.', 'error')
         return redirect(url_for('login'))
     try:
-        cur = mysql.connection.cursor()
-        cur.execute("SELECT id, title, summary, category, published_at, url, full_content FROM articles WHERE id = %s", (article_id,))
+        cur = get_db().cursor()
+        # 현재 사용자의 피드백 상태도 함께 조회 (페이지 로드 후 /feedback_status 호출 불필요)
+        cur.execute("""
+            SELECT a.id, a.title, a.summary, a.category, a.published_at, a.url, uf.feedback_type
+            FROM articles a
+            LEFT JOIN user_feedback uf ON uf.article_id = a.id AND uf.user_id = %s
+            WHERE a.id = %s
+        """, (session['user_id'], article_id))
         article = cur.fetchone()
         if not article:
             flash('존재하지 않는 기사입니다.', 'error')
@@ -589,27 +1184,34 @@ def article_detail(article_id):
         if cur:
             cur.close()
 
-@app.route('/article/<int:article_id>/view')
-def view_article(article_id):
+@app.route('/article/<int:article_id>/content')
+def article_content(article_id):
     if 'user_id' not in session:
-        flash('로그인이 필요합니다.', 'error')
-        return redirect(url_for('login'))
+        return jsonify({'status': 'error', 'message': '로그인이 필요합니다.'}), 401
+    cur = None
     try:
-        cur = mysql.connection.cursor()
-        cur.execute("SELECT url FROM articles WHERE id = %s", (article_id,))
+        cur = get_db().cursor()
+        cur.execute("SELECT full_content FROM articles WHERE id = %s", (article_id,))
         article = cur.fetchone()
         if not article:
-            flash('존재하지 않는 기사입니다.', 'error')
-            return redirect(url_for('home'))
-        log_user_action(session['user_id'], article_id, 'click_external_link')
-        article_url = article['url']
+            return jsonify({'status': 'error', 'message': '존재하지 않는 기사입니다.'}), 404
+        return jsonify({'status': 'success', 'full_content': article['full_content']}), 200
     except MySQLdb.Error as e:
-        flash(f"기사 로딩 중 오류 발생: {str(e)}", "error")
-        logger.error(f"View article error {article_id}: {str(e)}", exc_info=True)
-        return redirect(url_for('home'))
+        logger.error(f"Article content load error {article_id}: {str(e)}", exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
     finally:
         if cur:
             cur.close()
+
+@app.route('/article/<int:article_id>/view')
+def view_article(article_id):
+    if 'user_id' not in session:
+        flash('로그인이 필요합니다.', 'error')
+        return redirect(url_for('login'))
+    article_url = get_article_url(article_id)
+    if article_url is None:
+        return redirect(url_for('home'))
+    log_user_action(session['user_id'], article_id, 'click_external_link')
     return redirect(article_url)
 
 @app.route('/log_action', methods=['POST'])
@@ -625,10 +1227,13 @@ def log_action():
         action_type = data.get('action_type')
         read_time = data.get('read_time')
         scroll_depth = data.get('scroll_depth')
+        if action_type not in ACTION_LOG_TYPES:
+            return jsonify({'status': 'error', 'message': '유효하지 않은 action_type입니다.'}), 400
         
         log_user_action(user_id, article_id, action_type, read_time, scroll_depth)
+        schedule_recommendation_rebuild(session['user_id'])
         
-        return jsonify({'status': 'success', 'message': '액션 로깅 완료'}), 200
+        return '', 204
     except Exception as e:
         logger.error(f"Log action error: {str(e)}", exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -643,51 +1248,45 @@ def feedback():
         return jsonify({'status': 'error', 'message': '유효하지 않은 사용자 ID입니다.'}), 403
     article_id = data.get('article_id')
     feedback_type = data.get('feedback_type')
+    cur = None
     try:
-        cur = mysql.connection.cursor()
-        cur.execute("""
-            SELECT feedback_type
-            FROM user_feedback
-            WHERE user_id = %s AND article_id = %s
-        """, (user_id, article_id))
-        existing_feedback = cur.fetchone()
-
-        if feedback_type in ['like', 'dislike', 'read', 'click_external_link']:
-            if feedback_type in ['like', 'dislike']:
-                log_user_action(user_id, article_id, f'feedback_{feedback_type}')
+        cur = get_db().cursor()
 
         if feedback_type == 'cancel':
-            if existing_feedback:
-                cur.execute("""
-                    DELETE FROM user_feedback
-                    WHERE user_id = %s AND article_id = %s
-                """, (user_id, article_id))
-                mysql.connection.commit()
-                return jsonify({'status': 'success', 'message': '피드백 취소 완료'}), 200
-            return jsonify({'status': 'error', 'message': '취소할 피드백 없음'}), 400
-
-        if existing_feedback:
-            if existing_feedback['feedback_type'] == feedback_type:
-                return jsonify({'status': 'success', 'message': f'이미 {feedback_type} 피드백이 제출되었거나 처리되었습니다.'}), 200
-            else:
-                cur.execute("""
-                    UPDATE user_feedback SET feedback_type = %s, created_at = NOW()
-                    WHERE user_id = %s AND article_id = %s
-                """, (feedback_type, user_id, article_id))
-                mysql.connection.commit()
-                return jsonify({'status': 'success', 'message': f'피드백을 {feedback_type}로 업데이트 완료'}), 200
+            cur.execute("""
+                DELETE FROM user_feedback
+                WHERE user_id = %s AND article_id = %s
+            """, (user_id, article_id))
+            if cur.rowcount == 0:
+                return jsonify({'status': 'error', 'message': '취소할 피드백 없음'}), 400
+            get_db().commit()
+            invalidate_recommendations(user_id)
+            schedule_recommendation_rebuild(session['user_id'])
+            return jsonify({'status': 'success', 'message': '피드백 취소 완료', 'feedback_type': None}), 200
 
         if feedback_type in ['like', 'dislike', 'read', 'click_external_link']:
+            # (user_id, article_id) 고유 키로 조회 없이 한 번에 저장/변경 (타입이 바뀔 때만 created_at 갱신)
+            # affected rows: 1 = 새로 저장, 2 = 타입 변경, 0 = 동일 피드백이 이미 존재
             cur.execute("""
                 INSERT INTO user_feedback (user_id, article_id, feedback_type)
                 VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    created_at = IF(feedback_type = VALUES(feedback_type), created_at, NOW()),
+                    feedback_type = VALUES(feedback_type)
             """, (user_id, article_id, feedback_type))
-            mysql.connection.commit()
-            return jsonify({'status': 'success', 'message': f'{feedback_type} 피드백 저장'}), 200
+            affected_rows = cur.rowcount
+            get_db().commit()
+            if affected_rows == 0:
+                return jsonify({'status': 'success', 'message': f'이미 {feedback_type} 피드백이 제출되었거나 처리되었습니다.', 'feedback_type': feedback_type}), 200
+            invalidate_recommendations(user_id)
+            schedule_recommendation_rebuild(session['user_id'])
+            if affected_rows == 2:
+                return jsonify({'status': 'success', 'message': f'피드백을 {feedback_type}로 업데이트 완료', 'feedback_type': feedback_type}), 200
+            return jsonify({'status': 'success', 'message': f'{feedback_type} 피드백 저장', 'feedback_type': feedback_type}), 200
 
         return jsonify({'status': 'error', 'message': '유효하지 않은 피드백'}), 400
     except MySQLdb.Error as e:
-        mysql.connection.rollback()
+        get_db().rollback()
         logger.error(f"Feedback error for user {user_id}, article {article_id}: {str(e)}", exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
     finally:
@@ -704,7 +1303,7 @@ def feedback_status():
         return jsonify({'status': 'error', 'message': '유효하지 않은 사용자 ID입니다.'}), 403
     article_id = data.get('article_id')
     try:
-        cur = mysql.connection.cursor()
+        cur = get_db().cursor()
         cur.execute("""
             SELECT feedback_type
             FROM user_feedback
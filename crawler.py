@@ -1,14 +1,19 @@
 import os
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from flask import Flask
 from flask_mysqldb import MySQL
-from datetime import datetime
+from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
 import logging
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
+import hashlib
+import sqlite3
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from news_parser import strip_html, parse_naver_news_content
 
 # .env 파일 로드
 load_dotenv()
@@ -34,124 +39,357 @@ SEARCH_QUERIES = [
     "IT", "경제", "정치", "사회", "문화", "스포츠", "세계", "생활", "기술", "뉴스"
 ]
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    handlers=[
-                        logging.FileHandler("crawler.log"),
-                        logging.StreamHandler()
-                    ])
+# 기사 본문 동시 수집 스레드 수 (네트워크 대기 시간을 겹쳐서 처리)
+CONTENT_FETCH_WORKERS = 20
+
+# HTTP 요청 타임아웃 (연결, 읽기) 초. 응답 없는 서버에 워커 스레드가 묶이지 않도록
+HTTP_TIMEOUT = (3, 10)
+
+# 세션마다 keep-alive 커넥션 풀과 재시도(429/5xx 시 지수 백오프)를 설정
+def mount_retry_adapter(session):
+    adapter = HTTPAdapter(
+        pool_connections=CONTENT_FETCH_WORKERS,
+        pool_maxsize=CONTENT_FETCH_WORKERS,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# 기사 본문 수집용 세션 (모든 스레드가 공유, 같은 호스트 연결을 재사용)
+http_session = mount_retry_adapter(requests.Session())
+http_session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'})
+
+# 크롤러 캐시 파일 위치 (저장소 디렉터리 밖의 사용자 캐시 디렉터리, CRAWLER_CACHE_DIR로 변경 가능)
+CRAWLER_CACHE_DIR = os.getenv('CRAWLER_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'news_project'))
+
+# 네이버 검색 API 응답 캐시 (5분 내 재실행 시 같은 검색 결과를 다시 받지 않음, Cache-Control/ETag 헤더 존중)
+# 인증 헤더는 캐시 키에서 제외하고 저장되는 요청에서도 지움. sqlite 파일은 처음 요청할 때 열림
+_naver_api_session = None
+
+def get_naver_api_session():
+    global _naver_api_session
+    if _naver_api_session is None:
+        _naver_api_session = mount_retry_adapter(requests_cache.CachedSession(
+            os.path.join(CRAWLER_CACHE_DIR, 'naver_api'),
+            backend='sqlite',
+            expire_after=timedelta(minutes=5),
+            cache_control=True,
+            ignored_parameters=['X-Naver-Client-Id', 'X-Naver-Client-Secret']
+        ))
+    return _naver_api_session
+
 logger = logging.getLogger(__name__)
 
-# KeyBERT 모델 로드
-try:
-    logger.info("KeyBERT 모델 로딩 중...")
-    kw_model = KeyBERT(model=SentenceTransformer('jhgan/ko-sbert-nli'))
-    logger.info("KeyBERT 모델 로딩 완료.")
-except Exception as e:
-    logger.error(f"KeyBERT 모델 로딩 실패: {e}")
-    kw_model = None
+# SBERT 임베딩/키워드 캐시 파일 위치
+EMBEDDING_CACHE_DIR = CRAWLER_CACHE_DIR
+
+# 키워드 추출 방식: keybert(SBERT 의미 기반, 기본값) / tfidf(GPU 없는 서버에서 빠르게 처리)
+KEYWORD_EXTRACTOR = os.getenv('KEYWORD_EXTRACTOR', 'keybert')
+
+# KeyBERT 모델은 키워드 추출 단계에서 처음 필요할 때 로드 (모듈 import 시 로드하지 않음)
+_kw_model = None
+
+def get_kw_model():
+    global _kw_model
+    if _kw_model is None:
+        try:
+            logger.info("KeyBERT 모델 로딩 중...")
+            # torch/KeyBERT는 여기서 처음 import (본문 파싱 워커가 crawler.py를 다시 import해도 불러오지 않음)
+            from keyword_model import load_keybert_model
+            _kw_model = load_keybert_model(EMBEDDING_CACHE_DIR)
+            logger.info("KeyBERT 모델 로딩 완료.")
+        except Exception as e:
+            logger.error(f"KeyBERT 모델 로딩 실패: {e}")
+    return _kw_model
 
 # 불용어 목록
-COMMON_STOPWORDS = set([
+COMMON_STOPWORDS = frozenset([
     '대한', '우리', '이번', '지난', '동안', '이것', '그것', '저것', '다시', '관련', '위해', '통해', '등', '명', '것', '수', '점', '때', '곳', 
     '바', '및', '위', '중', '이', '그', '지난해', '오늘', '내일', '이날', '해당', '현재', '가지', '이제', '말', '월', '년', '일', '고', '면', 
     '좀', '개', '분', '뒤', '전', '기자', ' ', '습니다', '이다', '겁니다', '것이다', '같다', '일 것이다.', '입니다', '등등','없는', '많은', '모든', 
     '아주', '매우', '정말', '가장', '더욱', '오직', '결국', '물론', '또한', '과연', '단지', '이미', '여전히', '겨우', '그저', '내내', '마침',
-    '반드시', '비록', '설마', '아마', '어찌', '어차피', '언제나', '오히려', '원래', '일찍', '자주', '점점', '정작', '하필', '혹시', '계속', '과연', 
+    '반드시', '비록', '설마', '아마', '어찌', '어차피', '언제나', '오히려', '원래', '일찍', '자주', '점점', '정작', '하필', '혹시', '계속', 
     '다만', '따로', '마침내', '무려', '미처', '바깥', '빨리', '어느', '왠지', '이윽고', '조금', '한껏', '혼자', '훨씬', '가까이', '간혹', '결코', 
-    '고루', '공교롭게', '굳이', '그만', '극히', '급히', '깜짝', '꾸준히', '늘어', '다가', '다만', '다소', '대개', '더불어', '도저히', '드디어', 
-    '드문드문', '두루', '따라서', '딱히', '막상', '먼저','모조리', '무척', '미리', '바야흐로', '벌써', '별로', '보통', '비로소', '오히려', 
-    '어쩌면', '어째서', '오로지', '온통', '우연히', '을', '를', '은', '는', '이', '가','와', '과', '도', '만', '요', '죠', '에요', '예요', '해서', 
-    '하게', '하고', '거나', '든지', '든지', '부터', '까지', '에게', '한테', '께서', '으로', '로', '에서', '부터', '보다', '처럼', '만큼', '듯이', 
-    '뿐', '이다', '입니다', '이다', '다고', '라고', '으로', '러', '면서', '아서', '어서', '니까', '는데', '거든요', '지요', '나요', '인가', 
-    '을까', '까', '습니다', 'ㅂ니다', 'ㅂ시다', '어요', '아요', '어요', '해요', '하죠', '어떤', '몇', '어느', '무엇', '누구', '왜', '어디', '어떻게', 
-    '얼마나', '언제', '무슨', '아무', '여러분', '그리고', '그러나', '하지만', '또는', '즉', '따라서', '그러므로', '게다가', '더군다나', 
-    '아니면', '혹은', '예를', '들면', '즉', '다시', '말해', '결론적으로', '덧붙여', '마지막으로', '우선', '먼저', '다음으로', '또한', 
-    '아울러', '아니라', '뿐만', '아니라', '이와', '같이'
+    '고루', '공교롭게', '굳이', '그만', '극히', '급히', '깜짝', '꾸준히', '늘어', '다가', '다소', '대개', '더불어', '도저히', '드디어', 
+    '드문드문', '두루', '따라서', '딱히', '막상', '먼저','모조리', '무척', '미리', '바야흐로', '벌써', '별로', '보통', '비로소', 
+    '어쩌면', '어째서', '오로지', '온통', '우연히', '을', '를', '은', '는', '가','와', '과', '도', '만', '요', '죠', '에요', '예요', '해서', 
+    '하게', '하고', '거나', '든지', '부터', '까지', '에게', '한테', '께서', '으로', '로', '에서', '보다', '처럼', '만큼', '듯이', 
+    '뿐', '다고', '라고', '러', '면서', '아서', '어서', '니까', '는데', '거든요', '지요', '나요', '인가', 
+    '을까', '까', 'ㅂ니다', 'ㅂ시다', '어요', '아요', '해요', '하죠', '어떤', '몇', '무엇', '누구', '왜', '어디', '어떻게', 
+    '얼마나', '언제', '무슨', '아무', '여러분', '그리고', '그러나', '하지만', '또는', '즉', '그러므로', '게다가', '더군다나', 
+    '아니면', '혹은', '예를', '들면', '말해', '결론적으로', '덧붙여', '마지막으로', '우선', '다음으로', 
+    '아울러', '아니라', '뿐만', '이와', '같이'
 ])
 
-def extract_keywords_with_keybert(text, num_keywords=5, keyphrase_ngram_range=(1,2)):
+# KeyBERT 입력 전처리용 정규식 (태그/연속 공백 → 공백, 문장부호 제거)
+_TAG_OR_SPACE_RE = re.compile(r'<[^>]+>|\s+')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
+# KeyBERT 입력 최대 글자 수 (한국어 기준 SBERT 최대 토큰 길이보다 충분히 긴 길이)
+KEYBERT_MAX_CHARS = 2000
+
+def clean_text_for_keybert(text):
     if not text:
-        logger.debug("    [KeyBERT Debug] 입력 텍스트가 비어 있습니다. 키워드 추출 스킵.")
         return ""
-    clean_text = re.sub(r'<[^>]+>|\s+', ' ', text).strip()
-    clean_text = re.sub(r'[^\w\s]', '', clean_text)
+    clean_text = _TAG_OR_SPACE_RE.sub(' ', text).strip()
+    clean_text = _NON_WORD_RE.sub('', clean_text)
+    # SBERT는 최대 토큰 길이 이후를 잘라내므로 그 이상은 토큰화/후보 n-gram 생성 비용만 늘림
+    clean_text = clean_text[:KEYBERT_MAX_CHARS]
     logger.debug(f"    [KeyBERT Debug] 전처리 후 텍스트 길이: {len(clean_text)}. 내용(첫 50자): '{clean_text[:50]}...'")
-    if not clean_text:
-        logger.debug("    [KeyBERT Debug] 전처리 후 텍스트가 비어 있습니다. 키워드 추출 스킵.")
-        return ""
-    keywords_with_score = kw_model.extract_keywords(
-        clean_text,
-        keyphrase_ngram_range=keyphrase_ngram_range,
-        stop_words=None,
-        top_n=num_keywords * 2
-    )
-    logger.debug(f"    [KeyBERT Debug] KeyBERT 1차 추출 결과(점수 포함): {keywords_with_score}")
+    return clean_text
+
+def filter_keywords(keywords_with_score, num_keywords=5):
     final_keywords = []
     for keyword, score in keywords_with_score:
-        is_stopword_phrase = False
         words_in_keyword = keyword.split()
-        if not words_in_keyword:
+        if not words_in_keyword or any(len(word) < 2 or word in COMMON_STOPWORDS for word in words_in_keyword):
             continue
-        for word in words_in_keyword:
-            if word in COMMON_STOPWORDS or len(word) < 2:
-                is_stopword_phrase = True
-                break
-        if not is_stopword_phrase:
-            final_keywords.append(keyword)
-            if len(final_keywords) >= num_keywords:
-                break
+        final_keywords.append(keyword)
+        if len(final_keywords) >= num_keywords:
+            break
     logger.debug(f"    [KeyBERT Debug] 최종 필터링된 키워드: {final_keywords}")
     return ", ".join(final_keywords)
 
-def get_naver_news_content_and_keywords(url):
-    global kw_model
+# 후보 n-gram 분석기: 불용어가 포함된 n-gram은 임베딩/점수 계산 전에 제외 (기본 토큰 패턴은 2글자 이상 단어만 사용)
+def build_keyword_analyzer(keyphrase_ngram_range):
+    from sklearn.feature_extraction.text import CountVectorizer
+    base_analyzer = CountVectorizer(ngram_range=keyphrase_ngram_range).build_analyzer()
+    def analyzer(doc):
+        return [ngram for ngram in base_analyzer(doc) if not any(word in COMMON_STOPWORDS for word in ngram.split())]
+    return analyzer
+
+# TF-IDF 키워드 추출 (GPU 없는 서버용). 이번 실행에서 모은 본문 전체로 IDF를 계산하고 문서별 상위 n-gram을 선택
+def extract_keywords_tfidf(docs, num_keywords=5, keyphrase_ngram_range=(1,2)):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    vectorizer = TfidfVectorizer(analyzer=build_keyword_analyzer(keyphrase_ngram_range), max_features=50000)
+    tfidf = vectorizer.fit_transform(docs)
+    vocabulary = vectorizer.get_feature_names_out()
+    keywords_per_doc = []
+    for row in range(tfidf.shape[0]):
+        start, end = tfidf.indptr[row], tfidf.indptr[row + 1]
+        scores = tfidf.data[start:end]
+        columns = tfidf.indices[start:end]
+        top = np.argsort(-scores, kind='stable')[:num_keywords]
+        keywords_per_doc.append(filter_keywords([(vocabulary[columns[i]], float(scores[i])) for i in top], num_keywords))
+    return keywords_per_doc
+
+# 본문 해시 → 최종 키워드 문자열 캐시 (sqlite, 처음 필요할 때 연결)
+_keyword_cache = None
+
+def get_keyword_cache():
+    global _keyword_cache
+    if _keyword_cache is None:
+        os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+        _keyword_cache = sqlite3.connect(os.path.join(EMBEDDING_CACHE_DIR, 'keybert_keywords.sqlite'))
+        _keyword_cache.execute("CREATE TABLE IF NOT EXISTS keywords (text_hash TEXT PRIMARY KEY, keywords TEXT)")
+    return _keyword_cache
+
+# 여러 기사 본문의 키워드를 한 번에 추출 (SBERT 임베딩을 문서 묶음 단위로 배치 계산)
+def extract_keywords_batch(texts, num_keywords=5, keyphrase_ngram_range=(1,2)):
+    results = [""] * len(texts)
+    clean_texts = [clean_text_for_keybert(text) for text in texts]
+    indices = [i for i, clean_text in enumerate(clean_texts) if clean_text]
+    if not indices:
+        logger.debug("    [KeyBERT Debug] 키워드를 추출할 본문이 없습니다. 키워드 추출 스킵.")
+        return results
+    if KEYWORD_EXTRACTOR == 'tfidf':
+        for i, keywords in zip(indices, extract_keywords_tfidf([clean_texts[i] for i in indices], num_keywords, keyphrase_ngram_range)):
+            results[i] = keywords
+        return results
+    kw_model = get_kw_model()
     if kw_model is None:
         logger.error("[KeyBERT Error] KeyBERT 모델이 로드되지 않았습니다. 키워드 추출 불가.")
-        return None, "키워드 추출 실패: KeyBERT 모델 로드 오류"
+        return results
+
+    # 같은 본문(통신사 재전송 기사 등)은 이전 실행에서 추출한 키워드를 그대로 사용
+    keyword_cache = get_keyword_cache()
+    # 캐시 키에 SBERT 모델/정밀도도 포함 (설정을 바꾸면 이전 설정으로 뽑은 키워드를 재사용하지 않음)
+    hashes = {i: hashlib.sha1(f"{kw_model.embedding_tag}|{num_keywords}|{keyphrase_ngram_range}|{clean_texts[i]}".encode('utf-8')).hexdigest() for i in indices}
+    cached_keywords = {}
+    unique_hashes = list(dict.fromkeys(hashes.values()))
+    for start in range(0, len(unique_hashes), 500):
+        chunk = unique_hashes[start:start + 500]
+        cached_keywords.update(keyword_cache.execute(
+            f"SELECT text_hash, keywords FROM keywords WHERE text_hash IN ({','.join('?' * len(chunk))})", chunk))
+    for i in indices:
+        if hashes[i] in cached_keywords:
+            results[i] = cached_keywords[hashes[i]]
+    indices = [i for i in indices if hashes[i] not in cached_keywords]
+    logger.info(f"    [KeyBERT Debug] 키워드 캐시 적중 {len(hashes) - len(indices)}건, KeyBERT 추출 대상 {len(indices)}건")
+    if not indices:
+        return results
+
+    from sklearn.feature_extraction.text import CountVectorizer
+    docs = [clean_texts[i] for i in indices]
+    # 전체 문서에 공통인 후보 n-gram 어휘 하나로 임베딩/추출을 수행 (반복되는 n-gram은 한 번만 임베딩)
+    vectorizer = CountVectorizer(analyzer=build_keyword_analyzer(keyphrase_ngram_range))
+    doc_embeddings, word_embeddings = kw_model.extract_embeddings(docs, vectorizer=vectorizer)
+    # extract_keywords는 같은 문서로 어휘를 다시 학습하므로, 이미 학습된 어휘를 그대로 쓰도록 fit을 대체
+    vectorizer.fit = lambda *args, **kwargs: vectorizer
+    keywords_per_doc = kw_model.extract_keywords(
+        docs,
+        vectorizer=vectorizer,
+        top_n=num_keywords,
+        doc_embeddings=doc_embeddings,
+        word_embeddings=word_embeddings
+    )
+    # KeyBERT는 문서가 하나면 중첩 리스트가 아닌 키워드 리스트를 바로 반환
+    if len(docs) == 1:
+        keywords_per_doc = [keywords_per_doc]
+    for i, keywords_with_score in zip(indices, keywords_per_doc):
+        logger.debug(f"    [KeyBERT Debug] KeyBERT 1차 추출 결과(점수 포함): {keywords_with_score}")
+        results[i] = filter_keywords(keywords_with_score, num_keywords)
+    with keyword_cache:
+        keyword_cache.executemany("INSERT OR REPLACE INTO keywords (text_hash, keywords) VALUES (?, ?)",
+                                  [(hashes[i], results[i]) for i in indices])
+    return results
+
+def fetch_naver_news_html(url):
     logger.debug(f"\n--- [Crawler Debug] URL 처리 시작: {url}")
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'})
+        response = http_session.get(url, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        full_content = ""
-        content_div = soup.find('article', id='dic_area')
-        if not content_div:
-            content_div = soup.find('article', class_='go_trans _article_content')
-        if not content_div:
-            content_div = soup.find('div', id='dic_area')
-        if content_div:
-            for img_desc in content_div.find_all('em', class_='img_desc'):
-                img_desc.decompose()
-            for br in content_div.find_all('br'):
-                br.replace_with('\n')
-            full_content = content_div.get_text(strip=True)
-            full_content = re.sub(r'본문 내용 재생.*', '', full_content, flags=re.DOTALL)
-            full_content = re.sub(r'^(.*?)\(function', '', full_content, flags=re.DOTALL)
-            full_content = re.sub(r'flash 오류를 우회하기 위한 함수 추가\.[\s\S]*', '', full_content, flags=re.DOTALL)
-            full_content = re.sub(r'// flash content end\.[\s\S]*', '', full_content, flags=re.DOTALL)
-            full_content = re.sub(r'\[.+?\]', '', full_content)
-            full_content = re.sub(r'\(.+?\)기자', '', full_content)
-            full_content = re.sub(r'저작권자 ⓒ.+?\s', '', full_content)
-            full_content = re.sub(r'무단전재 및 재배포 금지\.?', '', full_content)
-            full_content = re.sub(r'\S+@\S+\.\S+', '', full_content)
-            full_content = re.sub(r'\d{2,4}-\d{3,4}-\d{4}', '', full_content)
-            full_content = re.sub(r'\n\s*\n', '\n', full_content)
-            full_content = full_content.strip()
-        else:
-            logging.warning(f"--- [Crawler Debug] 경고: 본문 콘텐츠 영역을 찾을 수 없습니다: {url}")
-            full_content = ""
-        logger.debug(f"--- [Crawler Debug] 추출된 본문 길이: {len(full_content)}. 내용(첫 100자): '{full_content[:100]}...'")
-        extracted_keywords_str = extract_keywords_with_keybert(full_content, num_keywords=5, keyphrase_ngram_range=(1,2))
-        logger.debug(f"--- [Crawler Debug] 최종 추출된 키워드: '{extracted_keywords_str}'")
-        return full_content, extracted_keywords_str
+        return response.content
     except requests.exceptions.RequestException as e:
         logger.error(f"--- [Crawler Error] 웹 크롤링 요청 오류 ({url}): {e}")
-        return "", ""
-    except Exception as e:
-        logger.error(f"--- [Crawler Error] 웹 크롤링 중 파싱 오류 ({url}): {e}", exc_info=True)
-        return "", ""
+        return None
+
+def collect_new_news_items(cur, headers):
+    # 1단계: 검색어별 API 결과에서 DB에 없는 네이버 뉴스만 모음
+    all_articles_count = 0
+    new_items = []
+    seen_links = set()
+    for query in SEARCH_QUERIES:
+        params = {
+            "query": query,
+            "display": 100,
+            "sort": "date"
+        } 
+        try:
+            response = get_naver_api_session().get(NAVER_NEWS_API_URL, headers=headers, params=params, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            news_data = response.json()
+            query_items = []
+            for item in news_data.get('items', []):
+                all_articles_count += 1
+                link = item['link']
+                if "n.news.naver.com/mnews/article" not in link:
+                    logger.info(f"[Main Debug] 네이버 뉴스 아티클 URL이 아님. 스킵: {link}")
+                    continue
+                title = strip_html(item['title'])
+                description = strip_html(item['description'])
+                logger.info(f"\n[Main Debug] 뉴스 제목: {title[:50]}...")
+                logger.info(f"[Main Debug] API 요약(description) 길이: {len(description)}. 내용(첫 100자): '{description[:100]}...'")
+                if not description.strip():
+                    logger.warning(f"[Main Debug] 경고: 이 뉴스의 API 요약이 비어있습니다. URL: {link}")
+                if link in seen_links:
+                    logger.info(f"[Main Debug] 다른 검색어에서 이미 수집한 뉴스 스킵: {title[:30]}...")
+                    continue
+                seen_links.add(link)
+                pub_date_str = item['pubDate']
+                pub_date_obj = datetime.strptime(pub_date_str[:-6], '%a, %d %b %Y %H:%M:%S')
+                query_items.append({
+                    'title': title,
+                    'description': description,
+                    'query': query,
+                    'pub_date': pub_date_obj,
+                    'link': link
+                })
+            # 이미 저장된 URL은 검색어 단위로 한 번에 조회해서 제외
+            existing_links = set()
+            if query_items:
+                placeholders = ','.join(['%s'] * len(query_items))
+                cur.execute(f"SELECT url FROM articles WHERE url IN ({placeholders})", [item['link'] for item in query_items])
+                existing_links = {row[0] for row in cur.fetchall()}
+            for item in query_items:
+                if item['link'] in existing_links:
+                    logger.info(f"[Main Debug] 이미 존재하는 뉴스 스킵: {item['title'][:30]}...")
+                    continue
+                logger.info(f"[Main Debug] 새 뉴스 발견: {item['title'][:30]}...")
+                new_items.append(item)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[Main Error] 네이버 API 요청 오류 ({query}): {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"[Main Error] 데이터 처리 중 오류 발생 ({query}): {e}", exc_info=True)
+    return all_articles_count, new_items
+
+# 추출한 키워드 문자열 → keywords.id
+# 비교를 MySQL 컬럼 콜레이션(utf8mb4_unicode_ci)에 맡기도록 요청한 문자열을 그대로 돌려받음
+# (Python str.lower()로는 악센트/전각 문자/끝 공백처럼 콜레이션이 같다고 보는 경우를 맞출 수 없음)
+def resolve_keyword_ids(cur, keyword_texts):
+    keyword_ids = {}
+    for start in range(0, len(keyword_texts), 500):
+        chunk = keyword_texts[start:start + 500]
+        requested = ' UNION ALL '.join(['SELECT %s AS keyword_text'] * len(chunk))
+        cur.execute(f"""
+            SELECT requested.keyword_text, k.id
+            FROM ({requested}) requested
+            JOIN keywords k ON k.keyword_text = CONVERT(requested.keyword_text USING utf8mb4) COLLATE utf8mb4_unicode_ci
+        """, chunk)
+        keyword_ids.update(cur.fetchall())
+    return keyword_ids
+
+# 검색어 하나에서 모은 기사/키워드/연결을 각각 executemany 한 번씩으로 저장 (커밋은 호출한 쪽에서)
+# INSERT IGNORE 대신 중복 키만 무시하므로 잘림 같은 데이터 오류는 예외로 드러남
+def store_news_group(cur, items, contents, keywords):
+    cur.executemany(
+        "INSERT INTO articles (title, summary, category, published_at, url, full_content) "
+        "VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE id = id",
+        [(item['title'], item['description'], item['query'], item['pub_date'], item['link'], full_content)
+         for item, full_content in zip(items, contents)]
+    )
+    new_articles_count = cur.rowcount
+    logger.info(f"[Main Debug] Articles 테이블에 {new_articles_count}건 삽입 완료 (중복 {len(items) - new_articles_count}건 스킵)")
+
+    links = [item['link'] for item in items]
+    cur.execute(f"SELECT id, url FROM articles WHERE url IN ({','.join(['%s'] * len(links))})", links)
+    article_ids = {url: article_id for article_id, url in cur.fetchall()}
+
+    keyword_lists = [[k.strip() for k in extracted_keywords_str.split(',') if k.strip()] for extracted_keywords_str in keywords]
+    keyword_texts = list(dict.fromkeys(keyword_text for keyword_list in keyword_lists for keyword_text in keyword_list))
+    if keyword_texts:
+        cur.executemany("INSERT INTO keywords (keyword_text) VALUES (%s) ON DUPLICATE KEY UPDATE id = id",
+                        [(keyword_text,) for keyword_text in keyword_texts])
+        keyword_ids = resolve_keyword_ids(cur, keyword_texts)
+        link_rows = set()
+        for item, keyword_list in zip(items, keyword_lists):
+            if item['link'] not in article_ids:
+                continue
+            for keyword_text in keyword_list:
+                if keyword_text in keyword_ids:
+                    link_rows.add((article_ids[item['link']], keyword_ids[keyword_text]))
+                else:
+                    logger.warning(f"[Main Warning] 키워드 ID를 찾지 못해 연결 스킵: '{keyword_text}' ({item['link']})")
+        if link_rows:
+            cur.executemany("INSERT INTO article_keywords (article_id, keyword_id) VALUES (%s, %s) "
+                            "ON DUPLICATE KEY UPDATE article_id = article_id", list(link_rows))
+        logger.info(f"[Main Debug] 키워드 {len(keyword_texts)}개, article_keywords 연결 {len(link_rows)}건 저장")
+    else:
+        logger.info(f"[Main Debug] 키워드 비어있음. 저장 스킵.")
+    return new_articles_count
+
+def store_news_items(cur, items, contents, keywords):
+    # 검색어(query) 묶음마다 저장하고 커밋 (한 묶음이 실패해도 앞서 커밋한 묶음은 유지)
+    groups = {}
+    for item, full_content, extracted_keywords_str in zip(items, contents, keywords):
+        group = groups.setdefault(item['query'], ([], [], []))
+        group[0].append(item)
+        group[1].append(full_content)
+        group[2].append(extracted_keywords_str)
+    new_articles_count = 0
+    for query, (group_items, group_contents, group_keywords) in groups.items():
+        try:
+            group_count = store_news_group(cur, group_items, group_contents, group_keywords)
+            mysql.connection.commit()
+            new_articles_count += group_count
+            logger.info(f"[Main Debug] '{query}' 검색어 묶음 저장 및 커밋 완료: {group_count}건")
+        except Exception as e_insert:
+            logger.error(f"[Main Error] '{query}' 검색어 묶음 저장 중 오류 발생 (이 묶음만 롤백): {e_insert}", exc_info=True)
+            mysql.connection.rollback()
+    logger.info(f"[Main Debug] --- 최종 저장 완료: {new_articles_count}건 ---")
+    return new_articles_count
 
 def fetch_and_store_news():
     headers = {
@@ -163,89 +401,38 @@ def fetch_and_store_news():
     cur = None
     try:
         cur = mysql.connection.cursor()
-        for query in SEARCH_QUERIES:
-            params = {
-                "query": query,
-                "display": 100,
-                "sort": "date"
-            } 
-            try:
-                response = requests.get(NAVER_NEWS_API_URL, headers=headers, params=params)
-                response.raise_for_status()
-                news_data = response.json()
-                for item in news_data.get('items', []):
-                    all_articles_count += 1
-                    link = item['link']
-                    if "n.news.naver.com/mnews/article" not in link:
-                        logger.info(f"[Main Debug] 네이버 뉴스 아티클 URL이 아님. 스킵: {link}")
-                        continue
-                    title = re.sub('<[^>]*>', '', item['title'])
-                    description = re.sub('<[^>]*>', '', item['description'])
-                    logger.info(f"\n[Main Debug] 뉴스 제목: {title[:50]}...")
-                    logger.info(f"[Main Debug] API 요약(description) 길이: {len(description)}. 내용(첫 100자): '{description[:100]}...'")
-                    if not description.strip():
-                        logger.warning(f"[Main Debug] 경고: 이 뉴스의 API 요약이 비어있습니다. URL: {link}")
-                    pub_date_str = item['pubDate']
-                    pub_date_obj = datetime.strptime(pub_date_str[:-6], '%a, %d %b %Y %H:%M:%S')
-                    cur.execute("SELECT id FROM articles WHERE url = %s", (link,))
-                    existing_article = cur.fetchone()
-                    if not existing_article:
-                        logger.info(f"[Main Debug] 새 뉴스 발견: {title[:30]}...")
-                        try:
-                            full_content, extracted_keywords_str = get_naver_news_content_and_keywords(link)
-                            cur.execute(
-                                "INSERT INTO articles (title, summary, category, published_at, url, full_content) "
-                                "VALUES (%s, %s, %s, %s, %s, %s)",
-                                (title, description, query, pub_date_obj, link, full_content)
-                            )
-                            article_id = cur.lastrowid
-                            logger.info(f"[Main Debug] Articles 테이블에 삽입 완료. article_id: {article_id}")
-                            if extracted_keywords_str:
-                                logger.info(f"[Main Debug] 키워드 추출 성공: '{extracted_keywords_str}'. DB 저장 시도.")
-                                keyword_list = [k.strip() for k in extracted_keywords_str.split(',') if k.strip()]
-                                for keyword_text in keyword_list:
-                                    if not keyword_text:
-                                        continue
-                                    cur.execute("SELECT id FROM keywords WHERE keyword_text = %s", (keyword_text,))
-                                    existing_keyword = cur.fetchone()
-                                    if existing_keyword:
-                                        keyword_id = existing_keyword[0]
-                                        logger.debug(f"[Main Debug] 기존 키워드 사용: '{keyword_text}' (id: {keyword_id})")
-                                    else:
-                                        cur.execute("INSERT INTO keywords (keyword_text) VALUES (%s)", (keyword_text,))
-                                        keyword_id = cur.lastrowid
-                                        logger.debug(f"[Main Debug] 새 키워드 삽입: '{keyword_text}' (id: {keyword_id})")
-                                    try:
-                                        cur.execute("INSERT INTO article_keywords (article_id, keyword_id) VALUES (%s, %s)", (article_id, keyword_id))
-                                        logger.debug(f"[Main Debug] article_keywords 연결 성공: article_id={article_id}, keyword_id={keyword_id}")
-                                    except Exception as e_link:
-                                        if "1062" not in str(e_link):
-                                            logger.error(f"[Main Error] article_keywords 연결 중 오류 발생: {e_link}", exc_info=True)
-                                        else:
-                                            logger.debug(f"[Main Debug] article_keywords 연결 중복 스킵: article_id={article_id}, keyword_id={keyword_id}")
-                            else:
-                                logger.info(f"[Main Debug] 키워드 비어있음. 저장 스킵.")
-                            mysql.connection.commit()
-                            new_articles_count += 1
-                            logger.info(f"[Main Debug] --- 최종 저장 및 커밋 완료: {title[:30]}... ---")
-                        except Exception as e_insert:
-                            if "1062" not in str(e_insert):
-                                logger.error(f"[Main Error] 뉴스 저장 중 오류 발생: {e_insert}", exc_info=True)
-                                mysql.connection.rollback()
-                            else:
-                                logger.info(f"[Main Debug] 중복 뉴스 스킵: {title[:30]}...")
-                    else:
-                        logger.info(f"[Main Debug] 이미 존재하는 뉴스 스킵: {title[:30]}...")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"[Main Error] 네이버 API 요청 오류 ({query}): {e}", exc_info=True)
-            except Exception as e:
-                logger.error(f"[Main Error] 데이터 처리 중 오류 발생 ({query}): {e}", exc_info=True)
+        all_articles_count, new_items = collect_new_news_items(cur, headers)
+
+        # 2단계: 새 뉴스 HTML은 스레드 풀에서 동시에 받고, 파싱/정리는 프로세스 풀에서 코어별로 처리 (결과 순서는 new_items와 동일)
+        links = [item['link'] for item in new_items]
+        with ThreadPoolExecutor(max_workers=CONTENT_FETCH_WORKERS) as executor:
+            htmls = list(executor.map(fetch_naver_news_html, links))
+        # 파싱 함수는 news_parser 모듈에 있고 crawler.py는 ML 라이브러리/캐시/로그 파일을 import 시 열지 않으므로
+        # spawn 플랫폼에서 워커가 모듈을 다시 import해도 가볍게 뜸. 새 기사 수보다 많이 띄우지 않음
+        contents = []
+        if htmls:
+            with ProcessPoolExecutor(max_workers=min(os.cpu_count(), len(htmls))) as executor:
+                contents = list(executor.map(parse_naver_news_content, htmls, links, chunksize=8))
+
+        # 3단계: 모든 본문의 키워드를 한 번의 배치로 추출
+        logger.info(f"[Main Debug] 새 뉴스 {len(new_items)}건 키워드 배치 추출 시작")
+        keywords = extract_keywords_batch(contents, num_keywords=5, keyphrase_ngram_range=(1,2))
+
+        # 4단계: DB 저장
+        new_articles_count = store_news_items(cur, new_items, contents, keywords)
     finally:
         if cur:
             cur.close()
     logger.info(f"\n총 {all_articles_count}개의 뉴스 처리 시도, {new_articles_count}개의 새 뉴스 저장 완료.")
 
 if __name__ == '__main__':
+    # 로깅 설정 (스크립트로 실행할 때만, 파싱 워커가 모듈을 다시 import할 때는 로그 파일을 열지 않음)
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[
+                            logging.FileHandler("crawler.log"),
+                            logging.StreamHandler()
+                        ])
     with app.app_context():
         logger.info("뉴스 크롤링 및 DB 저장 시작...")
         fetch_and_store_news()
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics import ndcg_score
 import logging
 import MySQLdb
 from flask import Flask
@@ -26,51 +25,70 @@ app.config['MYSQL_PORT'] = int(os.getenv('DB_PORT', 3306))
 app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
 mysql = MySQL(app)
 
+# DCG 위치별 할인값 1/log2(i+2) (K 최대 DCG_MAX_K까지 미리 계산)
+DCG_MAX_K = 100
+DCG_DISCOUNTS = 1.0 / np.log2(np.arange(2, DCG_MAX_K + 2))
+
+def build_hit_matrix(y_true, y_pred, k=10):
+    """사용자별 상위 K개 추천의 정답 여부를 (사용자 수, K) 불리언 행렬로 생성 (y_true 원소는 set)"""
+    hits = np.zeros((len(y_pred), k), dtype=bool)
+    for row, (true_items, pred_items) in enumerate(zip(y_true, y_pred)):
+        top_k = pred_items[:k]
+        hits[row, :len(top_k)] = [pred in true_items for pred in top_k]
+    return hits
+
 def calculate_map_at_k(y_true, y_pred, k=10):
     """MAP@K 계산"""
-    ap_scores = []
-    for true_items, pred_items in zip(y_true, y_pred):
-        if not true_items or not pred_items:
-            continue
-        hits = 0
-        score = 0.0
-        for i, pred in enumerate(pred_items[:k], 1):
-            if pred in true_items:
-                hits += 1
-                score += hits / i
-        ap_scores.append(score / min(len(true_items), k) if true_items else 0.0)
-    return np.mean(ap_scores) if ap_scores else 0.0
+    hits = build_hit_matrix(y_true, y_pred, k)
+    true_counts = np.fromiter((len(true_items) for true_items in y_true), dtype=np.int64, count=len(y_true))
+    pred_counts = np.fromiter((len(pred_items) for pred_items in y_pred), dtype=np.int64, count=len(y_pred))
+    evaluated = (true_counts > 0) & (pred_counts > 0)
+    if not evaluated.any():
+        return 0.0
+    # 적중 위치의 Precision@i 합 / min(정답 수, K)
+    precision_at_i = np.cumsum(hits, axis=1) / np.arange(1, k + 1)
+    ap_scores = (precision_at_i * hits).sum(axis=1)[evaluated] / np.minimum(true_counts[evaluated], k)
+    return np.mean(ap_scores)
 
 def calculate_hit_rate_at_k(y_true, y_pred, k=10):
     """HitRate@K 계산"""
-    hits = 0
-    total = 0
-    for true_items, pred_items in zip(y_true, y_pred):
-        if not true_items:
-            continue
-        total += 1
-        if any(pred in true_items for pred in pred_items[:k]):
-            hits += 1
-    return hits / total if total > 0 else 0.0
+    hits = build_hit_matrix(y_true, y_pred, k)
+    evaluated = np.fromiter((bool(true_items) for true_items in y_true), dtype=bool, count=len(y_true))
+    return float(hits[evaluated].any(axis=1).mean()) if evaluated.any() else 0.0
+
+def calculate_ndcg_at_k(y_true, y_pred, k=10):
+    """NDCG@K 계산 (이진 관련도, 이상적 순위는 정답 수 기준)"""
+    hits = build_hit_matrix(y_true, y_pred, k)
+    true_counts = np.fromiter((len(true_items) for true_items in y_true), dtype=np.int64, count=len(y_true))
+    pred_counts = np.fromiter((len(pred_items) for pred_items in y_pred), dtype=np.int64, count=len(y_pred))
+    evaluated = (true_counts > 0) & (pred_counts > 0)
+    if not evaluated.any():
+        return 0.0
+    discounts = DCG_DISCOUNTS[:k] if k <= DCG_MAX_K else 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = hits[evaluated] @ discounts
+    idcg = np.cumsum(discounts)[np.minimum(true_counts[evaluated], k) - 1]
+    return np.mean(dcg / idcg)
 
 def evaluate_model(model_name, get_recommendations_func):
     """모델 평가"""
     try:
-        cur = mysql.connection.cursor()
-        # user_feedback에서 'like' 피드백 가져오기
-        cur.execute("SELECT user_id, article_id FROM user_feedback WHERE feedback_type = 'like'")
-        feedback = cur.fetchall()
-        logger.info(f"Retrieved {len(feedback)} 'like' feedbacks from user_feedback")
-        cur.close()
-
-        # 사용자별 정답 레이블 생성
-        y_true = {}
-        for row in feedback:
-            user_id = row['user_id']
-            article_id = row['article_id']
-            if user_id not in y_true:
-                y_true[user_id] = []
-            y_true[user_id].append(article_id)
+        # 서버 측 커서로 행을 스트리밍하며 사용자별 정답 레이블 생성 (결과 전체를 메모리에 버퍼링하지 않음)
+        cur = mysql.connection.cursor(MySQLdb.cursors.SSDictCursor)
+        try:
+            # user_feedback에서 'like' 피드백 가져오기
+            cur.execute("SELECT user_id, article_id FROM user_feedback WHERE feedback_type = 'like'")
+            feedback_count = 0
+            y_true = {}
+            for row in cur:
+                feedback_count += 1
+                user_id = row['user_id']
+                article_id = row['article_id']
+                if user_id not in y_true:
+                    y_true[user_id] = set()
+                y_true[user_id].add(article_id)
+        finally:
+            cur.close()
+        logger.info(f"Retrieved {feedback_count} 'like' feedbacks from user_feedback")
         logger.info(f"Users with 'like' feedback: {len(y_true)}")
 
         # 추천 생성 및 평가
@@ -81,16 +99,11 @@ def evaluate_model(model_name, get_recommendations_func):
             logger.debug(f"User {user_id}: True={y_true.get(user_id, [])} Pred={y_pred.get(user_id, [])}")
 
         # 메트릭 계산
-        map_at_10 = calculate_map_at_k([y_true.get(u, []) for u in y_true], [y_pred.get(u, []) for u in y_true], k=10)
-        hit_rate_at_10 = calculate_hit_rate_at_k([y_true.get(u, []) for u in y_true], [y_pred.get(u, []) for u in y_true], k=10)
+        map_at_10 = calculate_map_at_k([y_true.get(u, set()) for u in y_true], [y_pred.get(u, []) for u in y_true], k=10)
+        hit_rate_at_10 = calculate_hit_rate_at_k([y_true.get(u, set()) for u in y_true], [y_pred.get(u, []) for u in y_true], k=10)
 
         # NDCG@10 계산
-        ndcg_scores = []
-        for user_id in y_true:
-            true_relevance = [1 if item in y_true[user_id] else 0 for item in y_pred.get(user_id, [])]
-            if true_relevance:
-                ndcg_scores.append(ndcg_score([true_relevance], [list(range(len(true_relevance), 0, -1))], k=10))
-        ndcg_at_10 = np.mean(ndcg_scores) if ndcg_scores else 0.0
+        ndcg_at_10 = calculate_ndcg_at_k([y_true.get(u, set()) for u in y_true], [y_pred.get(u, []) for u in y_true], k=10)
 
         logger.info(f"{model_name} Evaluation: MAP@10={map_at_10:.4f}, NDCG@10={ndcg_at_10:.4f}, HitRate@10={hit_rate_at_10:.4f}")
         print(f"{model_name} Evaluation: MAP@10={map_at_10:.4f}, NDCG@10={ndcg_at_10:.4f}, HitRate@10={hit_rate_at_10:.4f}")
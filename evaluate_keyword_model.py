@@ -3,13 +3,16 @@ import numpy as np
 from sklearn.metrics import ndcg_score
 import logging
 import MySQLdb
+from dbutils.pooled_db import PooledDB
 from flask import Flask
 from flask_mysqldb import MySQL
 from dotenv import load_dotenv
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # app.py에서 필요한 함수만 임포트 (get_db_connection은 이 파일에서 정의하므로 제외)
-from app import get_keyword_recommendations, get_bpr_recommendations
+from app import get_keyword_recommendations, get_bpr_recommendations, get_bpr_recommendations_batch
 
 # 로깅 설정: 파일명도 좀 더 일반적인 evaluate_models.log로 변경
 logging.basicConfig(filename='evaluate_models.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,17 +31,27 @@ app.config['MYSQL_PORT'] = int(os.getenv('DB_PORT', 3306))
 app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
 mysql = MySQL(app)
 
+# 평가용 MySQL 커넥션 풀 (모델별 평가마다 새로 연결하지 않고 재사용, close() 시 풀로 반환)
+db_pool = PooledDB(
+    creator=MySQLdb,
+    mincached=2,
+    maxcached=10,
+    blocking=True,
+    ping=1,
+    host=os.getenv('DB_HOST'),
+    user=os.getenv('DB_USER'),
+    passwd=os.getenv('DB_PASS'),
+    db=os.getenv('DB_NAME'),
+    port=int(os.getenv('DB_PORT', 3306)),
+    charset='utf8mb4',
+    # 원격 DB에서 대량 조회 시 전송량을 줄이도록 프로토콜 압축 사용 (DB_COMPRESS=1, 로컬 DB는 CPU만 더 씀)
+    compress=os.getenv('DB_COMPRESS') == '1'
+)
+
 # 이 파일 내에서 DB 연결 함수 정의 (app.py에서 가져올 필요 없음)
 def get_db_connection():
     try:
-        conn = MySQLdb.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            passwd=os.getenv('DB_PASS'),
-            db=os.getenv('DB_NAME'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            charset='utf8mb4'
-        )
+        conn = db_pool.connection()
         # logger.debug("DB 연결 성공!") # 너무 많은 로그 방지를 위해 debug 레벨로 변경
         return conn
     except MySQLdb.Error as e:
@@ -46,11 +59,23 @@ def get_db_connection():
         return None
 
 
+# DCG 위치별 할인값 1/log2(i+2) (K 최대 DCG_MAX_K까지 미리 계산)
+DCG_MAX_K = 100
+DCG_DISCOUNTS = 1.0 / np.log2(np.arange(2, DCG_MAX_K + 2))
+
+def get_dcg_discounts(k):
+    # 미리 계산한 범위를 넘는 K는 그 평가에서만 따로 계산
+    return DCG_DISCOUNTS if k <= DCG_MAX_K else 1.0 / np.log2(np.arange(2, k + 2))
+
+# 사용자별 평가 동시 실행 수 (추천 생성은 DB 대기 위주이므로 스레드로 겹쳐서 처리, 각 스레드는 풀에서 별도 연결 사용)
+EVALUATION_WORKERS = 8
+
 def calculate_extended_metrics(predicted_ranks, actual_liked_articles, actual_interacted_articles, k=10):
     ap_sum = 0.0
     ndcg_sum = 0.0
     hit_rate_sum = 0.0
     num_users_evaluated = 0
+    discounts = get_dcg_discounts(k)
 
     for user_id, predicted_list in predicted_ranks.items():
         if user_id not in actual_liked_articles or not actual_liked_articles[user_id]:
@@ -61,38 +86,22 @@ def calculate_extended_metrics(predicted_ranks, actual_liked_articles, actual_in
         actual_relevant = set(actual_liked_articles[user_id])
         actual_interacted = set(actual_interacted_articles.get(user_id, []))
 
-        # Calculate Average Precision (AP)
-        precision_at_k = []
-        hits = 0
-        for i, article_id in enumerate(predicted_list[:k], 1):
-            if article_id in actual_relevant:
-                hits += 1
-                precision_at_k.append(hits / i) # Precision@i
-        ap = sum(precision_at_k) / len(actual_relevant) if actual_relevant else 0.0 # 실제 관련 항목 수로 나눔 (MAP 정의에 따라)
-        ap_sum += ap
+        # 상위 K개 추천의 정답 여부 (이진 관련성: BPR은 예측 점수 자체가 절대적인 관련성이 아니므로 1 또는 0 사용)
+        top_k = predicted_list[:k]
+        hits = np.fromiter((article_id in actual_relevant for article_id in top_k), dtype=bool, count=len(top_k))
+
+        # Calculate Average Precision (AP): 적중 위치의 Precision@i 합을 실제 관련 항목 수로 나눔 (MAP 정의에 따라)
+        precision_at_i = np.cumsum(hits) / np.arange(1, len(hits) + 1)
+        ap_sum += precision_at_i[hits].sum() / len(actual_relevant)
 
         # Calculate Normalized Discounted Cumulative Gain (NDCG)
-        dcg = 0.0
-        idcg = 0.0
-        
-        # DCG calculation (using 2^relevance-1 / log2(i+1))
-        # BPR은 예측 점수 자체가 절대적인 관련성이 아니므로, 이진 관련성(1 또는 0)을 사용
-        # true_relevance를 1 (관련) 또는 0 (비관련)으로 단순화
-        for i, article_id in enumerate(predicted_list[:k]):
-            if article_id in actual_relevant:
-                dcg += 1.0 / np.log2(i + 2) # i+1이 0이 될 수 없으므로 i+2 (log2(1)부터 시작)
-            
-        # Ideal DCG: 모든 관련 항목이 상위에 있다고 가정
-        # 실제 관련 항목 수만큼 1/log2(i+1)을 더함
-        for i in range(min(k, len(actual_relevant))): # 실제 relevant 한 아이템 수 만큼 idcg 계산
-            idcg += 1.0 / np.log2(i + 2)
-            
-        ndcg = dcg / idcg if idcg > 0 else 0.0
-        ndcg_sum += ndcg
+        # Ideal DCG: 모든 관련 항목이 상위에 있다고 가정하고 실제 관련 항목 수만큼 할인값을 더함
+        dcg = discounts[:len(hits)][hits].sum()
+        idcg = discounts[:min(k, len(actual_relevant))].sum()
+        ndcg_sum += dcg / idcg if idcg > 0 else 0.0
 
         # Calculate HitRate (At least one liked item is in top-K)
-        if any(pred in actual_relevant for pred in predicted_list[:k]):
-            hit_rate_sum += 1
+        hit_rate_sum += hits.any()
 
     map_score = ap_sum / num_users_evaluated if num_users_evaluated > 0 else 0.0
     ndcg_score = ndcg_sum / num_users_evaluated if num_users_evaluated > 0 else 0.0
@@ -100,29 +109,50 @@ def calculate_extended_metrics(predicted_ranks, actual_liked_articles, actual_in
     
     return map_score, ndcg_score, hit_rate
 
-def evaluate_recommendation_model(user_id, model_type='keyword', batch_id=None, k=10):
+# 평가 대상 사용자('like' 피드백이 있는 사용자) 전체의 정답과 상호작용 기록을 사용자별로 한 번에 조회
+def fetch_user_ground_truth(conn, fetch_size=10000):
+    liked_by_user = defaultdict(list)
+    interacted_by_user = defaultdict(set)
+
+    # 서버 측 커서로 fetch_size씩 받아 처리 (로그 전체를 클라이언트 메모리에 버퍼링하지 않음)
+    cur = conn.cursor(MySQLdb.cursors.SSCursor)
+    try:
+        # 피드백과 열람 기록(HitRate 계산용 상호작용)을 한 번의 UNION ALL 조회로 가져옴 (열람 기록은 feedback_type이 NULL)
+        # 대상 사용자는 id 목록을 파라미터로 넘기지 않고 서브쿼리(semi-join)로 지정
+        cur.execute("""
+            SELECT user_id, article_id, feedback_type FROM user_feedback
+            WHERE user_id IN (SELECT user_id FROM user_feedback WHERE feedback_type = 'like')
+            UNION ALL
+            SELECT user_id, article_id, NULL FROM user_article_log
+            WHERE user_id IN (SELECT user_id FROM user_feedback WHERE feedback_type = 'like')
+        """)
+        while True:
+            rows = cur.fetchmany(fetch_size)
+            if not rows:
+                break
+            for user_id, article_id, feedback_type in rows:
+                interacted_by_user[user_id].add(article_id)
+                # 'like' 피드백만 실제 정답(Ground Truth)으로 사용
+                if feedback_type == 'like':
+                    liked_by_user[user_id].append(article_id)
+    finally:
+        cur.close()
+
+    return liked_by_user, interacted_by_user
+
+def evaluate_recommendation_model(user_id, actual_liked_articles_ids, actual_interacted_articles_ids, model_type='keyword', batch_id=None, k=10,
+                                  predicted_recommendations_info=None):
     with app.app_context():
-        conn = None
-        cur = None
         try:
-            conn = get_db_connection() # 이 파일의 get_db_connection 사용
-            cur = conn.cursor(MySQLdb.cursors.DictCursor)
             logger.info(f"Evaluating {model_type} model for user {user_id}, k={k}")
+            # 정답(like)이 없으면 평가 결과가 0이므로 추천 생성 자체를 생략
+            if not actual_liked_articles_ids:
+                return {'map': 0, 'ndcg': 0, 'hit_rate': 0}
 
-            # 'like' 피드백만 실제 정답(Ground Truth)으로 사용
-            cur.execute("SELECT article_id FROM user_feedback WHERE user_id = %s AND feedback_type = 'like'", (user_id,))
-            actual_liked_articles_ids = [row['article_id'] for row in cur.fetchall()]
-            
-            # 모든 상호작용 기록 (HitRate 계산용)
-            cur.execute("SELECT article_id FROM user_article_log WHERE user_id = %s", (user_id,))
-            actual_interacted_articles_ids_log = [row['article_id'] for row in cur.fetchall()]
-            cur.execute("SELECT article_id FROM user_feedback WHERE user_id = %s", (user_id,))
-            actual_interacted_articles_ids_feedback = [row['article_id'] for row in cur.fetchall()]
-            actual_interacted_articles_ids = list(set(actual_interacted_articles_ids_log + actual_interacted_articles_ids_feedback))
-
-
-            predicted_recommendations_info = []
-            if model_type == 'keyword':
+            # 미리 일괄 생성한 추천이 있으면 그대로 사용
+            if predicted_recommendations_info is not None:
+                pass
+            elif model_type == 'keyword':
                 predicted_recommendations_info = get_keyword_recommendations(user_id, top_n=k, batch_id=batch_id)
             elif model_type == 'bpr':
                 predicted_recommendations_info = get_bpr_recommendations(user_id, top_n=k, batch_id=batch_id)
@@ -151,11 +181,6 @@ def evaluate_recommendation_model(user_id, model_type='keyword', batch_id=None,
         except Exception as e:
             logger.error(f"Unexpected error evaluating {model_type} model for user {user_id}: {str(e)}", exc_info=True)
             return {'map': 0, 'ndcg': 0, 'hit_rate': 0}
-        finally:
-            if cur:
-                cur.close()
-            # if conn: # evaluate_recommendation_model 에서는 connection을 닫지 않음 (Flask context에서 관리)
-            #     conn.close()
 
 def evaluate_all_users(model_type='bpr', k=10):
     logger.info(f"--- {model_type.upper()} Model Evaluation Started ---")
@@ -173,18 +198,30 @@ def evaluate_all_users(model_type='bpr', k=10):
             logger.warning(f"No users with 'like' feedback found for {model_type} model evaluation.")
             return {'avg_map': 0, 'avg_ndcg': 0, 'avg_hit_rate': 0}
 
-        map_scores = []
-        ndcg_scores = []
-        hit_rates = []
-        for user_id in user_ids:
-            metrics = evaluate_recommendation_model(user_id, model_type=model_type, k=k)
-            map_scores.append(metrics['map'])
-            ndcg_scores.append(metrics['ndcg'])
-            hit_rates.append(metrics['hit_rate'])
-
-        avg_map = sum(map_scores) / len(map_scores) if map_scores else 0
-        avg_ndcg = sum(ndcg_scores) / len(ndcg_scores) if ndcg_scores else 0
-        avg_hit_rate = sum(hit_rates) / len(hit_rates) if hit_rates else 0
+        liked_by_user, interacted_by_user = fetch_user_ground_truth(conn)
+
+        # BPR은 전체 사용자 추천을 행렬곱/조회 한 번으로 미리 생성 (키워드 추천은 사용자별 SQL이라 아래에서 개별 생성)
+        batch_recommendations = {}
+        if model_type == 'bpr':
+            with app.app_context():
+                batch_recommendations = get_bpr_recommendations_batch(user_ids, top_n=k)
+
+        with ThreadPoolExecutor(max_workers=EVALUATION_WORKERS) as executor:
+            all_metrics = list(executor.map(
+                lambda user_id: evaluate_recommendation_model(
+                    user_id,
+                    liked_by_user.get(user_id, []),
+                    list(interacted_by_user.get(user_id, ())),
+                    model_type=model_type,
+                    k=k,
+                    predicted_recommendations_info=batch_recommendations.get(user_id)
+                ),
+                user_ids
+            ))
+
+        # 사용자별 (MAP, NDCG, HitRate)를 (사용자 수, 3) 배열로 모아 한 번에 평균
+        metric_scores = np.array([(metrics['map'], metrics['ndcg'], metrics['hit_rate']) for metrics in all_metrics], dtype=np.float64)
+        avg_map, avg_ndcg, avg_hit_rate = metric_scores.mean(axis=0).tolist() if len(metric_scores) else (0, 0, 0)
         logger.info(f"--- {model_type.upper()} Model Average Results ---")
         logger.info(f"MAP@{k}={avg_map:.4f}, NDCG@{k}={avg_ndcg:.4f}, HitRate@{k}={avg_hit_rate:.4f}")
         print(f"--- {model_type.upper()} Model Average Results ---")
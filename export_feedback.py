@@ -15,7 +15,9 @@ def get_db_connection():
             passwd=os.getenv('DB_PASS'),
             db=os.getenv('DB_NAME'),
             port=int(os.getenv('DB_PORT', 3306)),
-            charset='utf8mb4'
+            charset='utf8mb4',
+            # 원격 DB에서 대량 조회 시 전송량을 줄이도록 프로토콜 압축 사용 (DB_COMPRESS=1)
+            compress=os.getenv('DB_COMPRESS') == '1'
         )
         print("DB 연결 성공!")
         return conn
@@ -41,21 +43,32 @@ def export_feedback_to_csv():
         limit = int(total_rows * 0.2)
         print(f"Offset: {offset}, Limit: {limit}")
 
-        # 20% 데이터 쿼리
-        cur.execute("""
-            SELECT user_id, article_id, feedback_type
-            FROM user_feedback
-            ORDER BY created_at
-            LIMIT %s, %s
-        """, (offset, limit))
-        rows = cur.fetchall()
+        # 80% 지점 행의 (created_at, id)를 created_at 인덱스만으로 찾음 (앞쪽 80% 행을 정렬/읽지 않음)
+        cur.execute("SELECT created_at, id FROM user_feedback ORDER BY created_at, id LIMIT 1 OFFSET %s", (offset,))
+        cutoff = cur.fetchone()
+        cur.close()
+
+        # 20% 데이터 쿼리: 기준 행부터 키셋으로 이어서 읽음 (서버 측 커서로 받으면서 바로 CSV에 기록)
+        cur = conn.cursor(MySQLdb.cursors.SSCursor)
+        if cutoff is not None:
+            cur.execute("""
+                SELECT user_id, article_id, feedback_type
+                FROM user_feedback
+                WHERE created_at > %s OR (created_at = %s AND id >= %s)
+                ORDER BY created_at, id
+                LIMIT %s
+            """, (cutoff['created_at'], cutoff['created_at'], cutoff['id'], limit))
 
         # CSV 파일 저장 (프로젝트 폴더에 저장)
         output_file = 'test_feedback.csv'  # 상대 경로
         with open(output_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
             writer.writerow(['user_id', 'article_id', 'feedback_type'])  # 헤더
-            writer.writerows([[row['user_id'], row['article_id'], row['feedback_type']] for row in rows])
+            while cutoff is not None:
+                rows = cur.fetchmany(10000)
+                if not rows:
+                    break
+                writer.writerows(rows)
 
         print(f"데이터가 {os.path.abspath(output_file)}에 저장되었습니다!")
 
@@ -0,0 +1,107 @@
+import os
+import logging
+import hashlib
+import sqlite3
+import numpy as np
+from keybert import KeyBERT
+from sentence_transformers import SentenceTransformer
+import torch
+
+# KeyBERT/SBERT 모델 로드 (torch 등 무거운 라이브러리를 import하므로 crawler.py가 키워드 추출 단계에서만 import)
+logger = logging.getLogger(__name__)
+
+# SBERT 임베딩을 텍스트 SHA-1 기준으로 디스크(sqlite)에 캐시하는 SentenceTransformer
+# 통신사 기사처럼 같은 본문/후보 n-gram이 반복되면 트랜스포머 연산 없이 캐시에서 바로 반환
+# 모델/정밀도별로 임베딩 값이 다르므로 캐시 파일을 분리
+class CachedSentenceTransformer(SentenceTransformer):
+    def __init__(self, model_name_or_path, cache_path, **kwargs):
+        super().__init__(model_name_or_path, **kwargs)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.embedding_cache = sqlite3.connect(cache_path)
+        # 임베딩은 float16으로 저장해 캐시 크기를 절반으로
+        # 새로 인코딩한 임베딩도 같은 float16 값으로 반올림해 반환하므로 캐시 적중 여부와 관계없이 키워드 순위가 같음
+        self.embedding_cache.execute("CREATE TABLE IF NOT EXISTS embeddings_f16 (text_hash TEXT PRIMARY KEY, embedding BLOB)")
+
+    def encode(self, sentences, **kwargs):
+        kwargs.pop('convert_to_numpy', None)
+        single_sentence = isinstance(sentences, str)
+        if single_sentence:
+            sentences = [sentences]
+        hashes = [hashlib.sha1(sentence.encode('utf-8')).hexdigest() for sentence in sentences]
+
+        cached = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique_hashes), 500):
+            chunk = unique_hashes[start:start + 500]
+            rows = self.embedding_cache.execute(
+                f"SELECT text_hash, embedding FROM embeddings_f16 WHERE text_hash IN ({','.join('?' * len(chunk))})", chunk)
+            cached.update((text_hash, np.frombuffer(blob, dtype=np.float16).astype(np.float32)) for text_hash, blob in rows)
+
+        # 캐시에 없는 문장만 한 번의 배치로 인코딩
+        missing = {}
+        for sentence, text_hash in zip(sentences, hashes):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = sentence
+        if missing:
+            with torch.inference_mode():
+                embeddings = np.asarray(super().encode(list(missing.values()), convert_to_numpy=True, **kwargs), dtype=np.float16)
+            with self.embedding_cache:
+                self.embedding_cache.executemany(
+                    "INSERT OR REPLACE INTO embeddings_f16 (text_hash, embedding) VALUES (?, ?)",
+                    [(text_hash, embedding.tobytes()) for text_hash, embedding in zip(missing, embeddings)])
+            cached.update(zip(missing, embeddings.astype(np.float32)))
+        logger.debug(f"    [KeyBERT Debug] 임베딩 캐시 적중 {len(unique_hashes) - len(missing)}건, 신규 인코딩 {len(missing)}건")
+
+        if not sentences:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        result = np.stack([cached[text_hash] for text_hash in hashes])
+        return result[0] if single_sentence else result
+
+# torch 추론 설정은 모델을 처음 로드할 때 한 번만 적용
+def configure_torch_inference():
+    # SBERT 추론은 크롤러 프로세스의 유일한 연산 작업이므로 코어 전체를 intra-op 스레드로 사용
+    torch.set_num_threads(os.cpu_count())
+    torch.set_num_interop_threads(1)
+    # 추론만 하므로 autograd 기록을 전역으로 끔
+    torch.set_grad_enabled(False)
+
+# SBERT 추론 장치: CUDA → Apple MPS → CPU 순으로 사용 가능한 것을 선택
+def get_inference_device():
+    if torch.cuda.is_available():
+        return 'cuda'
+    if torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+# SBERT 추론 정밀도: auto(GPU면 fp16, CPU면 Linear 레이어 int8 동적 양자화) / fp16 / int8 / fp32
+SBERT_PRECISION = os.getenv('SBERT_PRECISION', 'auto')
+
+def load_sentence_model(cache_dir, model_name='jhgan/ko-sbert-nli'):
+    configure_torch_inference()
+    device = get_inference_device()
+    precision = SBERT_PRECISION
+    if precision == 'auto':
+        precision = 'fp16' if device != 'cpu' else 'int8'
+    if precision == 'int8':
+        # 동적 양자화 커널은 CPU 전용
+        device = 'cpu'
+    cache_path = os.path.join(cache_dir, f"sbert_embeddings_{model_name.replace('/', '_')}_{precision}.sqlite")
+    model = CachedSentenceTransformer(model_name, cache_path=cache_path, device=device)
+    # 키워드 결과 캐시 키에 포함할 모델/정밀도
+    model.embedding_tag = f"{model_name}|{precision}"
+    if precision == 'fp16':
+        model.half()
+    elif precision == 'int8':
+        # 임베딩 캐시(sqlite 연결)를 복사하지 않도록 inplace로 양자화
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    logger.info(f"SBERT 추론 정밀도: {precision} (device: {model.device})")
+    # Python 구현 토크나이저는 Rust(fast) 토크나이저보다 수 배 느리므로 로드 시 확인
+    if not getattr(model.tokenizer, 'is_fast', False):
+        logger.warning("SBERT 토크나이저가 fast 버전이 아닙니다. tokenizers 패키지 설치를 확인하세요.")
+    return model
+
+def load_keybert_model(cache_dir):
+    sentence_model = load_sentence_model(cache_dir)
+    kw_model = KeyBERT(model=sentence_model)
+    kw_model.embedding_tag = sentence_model.embedding_tag
+    return kw_model
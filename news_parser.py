@@ -0,0 +1,84 @@
+import re
+import html
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree, html as lxml_html
+
+# 기사 본문 파싱/정리 (crawler.py의 프로세스 풀 워커가 import하는 모듈이므로 ML 라이브러리/캐시/DB를 import하지 않음)
+logger = logging.getLogger(__name__)
+
+# 본문 정리용 정규식 (모듈 로드 시 한 번만 컴파일)
+# 앞 패턴이 지운 결과에 다음 패턴이 적용되므로 원래 순서대로 하나씩 적용
+_BODY_NOISE_PATTERNS = (
+    re.compile(r'본문 내용 재생.*', re.DOTALL),
+    re.compile(r'^(.*?)\(function', re.DOTALL),
+    re.compile(r'flash 오류를 우회하기 위한 함수 추가\.[\s\S]*'),
+    re.compile(r'// flash content end\.[\s\S]*'),
+    re.compile(r'\[.+?\]'),                    # [대괄호 설명]
+    re.compile(r'\(.+?\)기자'),                 # (지역)기자
+    re.compile(r'저작권자 ⓒ.+?\s'),
+    re.compile(r'무단전재 및 재배포 금지\.?'),
+    re.compile(r'\S+@\S+\.\S+'),               # 이메일
+    re.compile(r'\d{2,4}-\d{3,4}-\d{4}'),       # 전화번호
+)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_HTML_TAG_RE = re.compile('<[^>]*>')
+
+# API 제목/요약의 <b> 태그 제거와 &quot; 같은 HTML 엔티티 디코딩을 lxml(C 구현)로 한 번에 처리
+def strip_html(text):
+    if not text:
+        return ""
+    try:
+        return lxml_html.fragment_fromstring(text, create_parent='div').text_content()
+    except Exception:
+        return html.unescape(_HTML_TAG_RE.sub('', text))
+
+# 기사 페이지에서 본문 영역만 파싱하기 위한 필터
+_CONTENT_STRAINER = SoupStrainer(['article', 'div'], id='dic_area')
+_ARTICLE_STRAINER = SoupStrainer('article')
+
+# #dic_area 본문의 텍스트 노드 (이미지 설명 em.img_desc, script/style 제외). BeautifulSoup get_text(strip=True)와 같은 결과
+_CONTENT_TEXT_XPATH = etree.XPath(
+    '(//article[@id="dic_area"] | //div[@id="dic_area"])[1]//text()'
+    '[not(ancestor::em[contains(concat(" ", normalize-space(@class), " "), " img_desc ")])'
+    ' and not(ancestor::script) and not(ancestor::style)]'
+)
+
+def clean_article_body(full_content):
+    for pattern in _BODY_NOISE_PATTERNS:
+        full_content = pattern.sub('', full_content)
+    full_content = _BLANK_LINES_RE.sub('\n', full_content)
+    return full_content.strip()
+
+# 프로세스 풀 워커에서 실행되므로 bytes를 받아 본문 문자열만 반환 (GIL 없이 여러 코어에서 파싱/정규식 처리)
+def parse_naver_news_content(page_html, url):
+    if not page_html:
+        return ""
+    try:
+        # 네이버 기사 페이지 구조에 맞춘 XPath로 본문 텍스트를 바로 추출 (대부분 여기서 처리됨)
+        text_nodes = _CONTENT_TEXT_XPATH(lxml_html.document_fromstring(page_html))
+        if text_nodes:
+            full_content = clean_article_body(''.join(text.strip() for text in text_nodes))
+            logger.debug(f"--- [Crawler Debug] 추출된 본문 길이: {len(full_content)}. 내용(첫 100자): '{full_content[:100]}...'")
+            return full_content
+
+        # 본문 영역(#dic_area)만 lxml로 파싱하고, 없으면 <article> 태그만 다시 파싱해 go_trans 본문을 찾음
+        soup = BeautifulSoup(page_html, 'lxml', parse_only=_CONTENT_STRAINER)
+        content_div = soup.select_one('article#dic_area, div#dic_area')
+        if not content_div:
+            soup = BeautifulSoup(page_html, 'lxml', parse_only=_ARTICLE_STRAINER)
+            content_div = soup.select_one('article.go_trans._article_content')
+        full_content = ""
+        if content_div:
+            for img_desc in content_div.select('em.img_desc'):
+                img_desc.extract()
+            full_content = content_div.get_text(strip=True)
+            full_content = clean_article_body(full_content)
+        else:
+            logging.warning(f"--- [Crawler Debug] 경고: 본문 콘텐츠 영역을 찾을 수 없습니다: {url}")
+            full_content = ""
+        logger.debug(f"--- [Crawler Debug] 추출된 본문 길이: {len(full_content)}. 내용(첫 100자): '{full_content[:100]}...'")
+        return full_content
+    except Exception as e:
+        logger.error(f"--- [Crawler Error] 웹 크롤링 중 파싱 오류 ({url}): {e}", exc_info=True)
+        return ""
@@ -1,4 +1,5 @@
 -- 데이터베이스가 이미 존재하면 삭제하여 초기화합니다. (개발 환경에서 유용)
+-- 데이터를 유지해야 하는 기존 DB에는 이 파일 대신 schema/migrations/의 스크립트를 번호 순서대로 적용합니다.
 DROP DATABASE IF EXISTS AI_master;
 
 -- AI_master 데이터베이스를 생성합니다.
@@ -8,6 +9,10 @@ CREATE DATABASE AI_master CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 -- 이후의 모든 SQL 명령은 AI_master 데이터베이스 내에서 실행됩니다.
 USE AI_master;
 
+-- FULLTEXT(ngram) 인덱스는 생성 시점의 stopword 설정을 그대로 사용합니다.
+-- 기본 영어 stopword('a', 'in', 'it' 등)를 포함한 ngram 토큰은 모두 버려져 'AI', 'IT' 같은 검색어를 찾지 못하므로 끕니다.
+SET SESSION innodb_ft_enable_stopword = OFF;
+
 -- 1. users 테이블: 사용자 정보 저장
 -- 웹 서비스 사용자의 계정 정보를 관리합니다.
 CREATE TABLE users (
@@ -36,7 +41,8 @@ CREATE TABLE articles (
 
     -- 인덱스 추가: 검색 및 정렬 성능 최적화
     INDEX idx_category (category),                 -- 카테고리별 기사 조회 시 효율적
-    INDEX idx_published_at (published_at)          -- 발행 일시 기준으로 정렬하거나 범위 조회 시 효율적
+    INDEX idx_published_at (published_at),         -- 발행 일시 기준으로 정렬하거나 범위 조회 시 효율적
+    FULLTEXT INDEX ft_title_summary (title, summary) WITH PARSER ngram -- 기사 검색용 전문 인덱스 (한글은 ngram 파서 필요)
 ) ENGINE=InnoDB;
 
 -- 3. keywords 테이블: 추출된 키워드 저장
@@ -44,7 +50,8 @@ CREATE TABLE articles (
 -- 이는 키워드 기반 추천 시스템의 핵심 요소입니다.
 CREATE TABLE keywords (
     id INT AUTO_INCREMENT PRIMARY KEY,             -- 키워드 고유 ID (자동 증가, 기본 키)
-    keyword_text VARCHAR(255) NOT NULL UNIQUE      -- 키워드 텍스트 (중복되지 않아야 함, 고유 인덱스)
+    keyword_text VARCHAR(255) NOT NULL UNIQUE,     -- 키워드 텍스트 (중복되지 않아야 함, 고유 인덱스)
+    FULLTEXT INDEX ft_keyword_text (keyword_text) WITH PARSER ngram -- 키워드 부분 일치 검색용 전문 인덱스 (stopword 끈 상태로 생성, 'IT' 같은 영문 키워드 검색용)
 ) ENGINE=InnoDB;
 
 -- 4. article_keywords 테이블: 기사와 키워드 간의 관계 매핑
@@ -60,8 +67,7 @@ CREATE TABLE article_keywords (
     FOREIGN KEY (keyword_id) REFERENCES keywords(id) ON DELETE CASCADE, -- 키워드 삭제 시 관련 기사 연결 자동 삭제
 
     -- 인덱스 추가: 관계 조회 성능 최적화
-    INDEX idx_article_id (article_id),             -- 특정 기사와 연관된 키워드 조회 시 효율적
-    INDEX idx_keyword_id (keyword_id)              -- 특정 키워드와 연관된 기사 조회 시 효율적
+    INDEX idx_keyword_article (keyword_id, article_id) -- 키워드 → 기사 조인 시 커버링 인덱스로 테이블 접근 없이 처리
 ) ENGINE=InnoDB;
 
 -- 5. user_feedback 테이블: 사용자 피드백(좋아요/싫어요/읽음 등) 저장
@@ -79,9 +85,13 @@ CREATE TABLE user_feedback (
     FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE, -- article 삭제 시 관련 피드백 자동 삭제
 
     -- 인덱스 추가: 관련 피드백 조회 성능 최적화
-    INDEX idx_user_id (user_id),                   -- 특정 사용자의 피드백 조회 시 효율적
     INDEX idx_article_id (article_id),             -- 특정 기사에 대한 피드백 조회 시 효율적
-    INDEX idx_feedback_type (feedback_type)        -- 특정 타입의 피드백 조회 시 효율적
+    INDEX idx_feedback_type (feedback_type),       -- 특정 타입의 피드백 조회 시 효율적
+    INDEX idx_user_article_type (user_id, article_id, feedback_type), -- 추천 시 사용자별 피드백/싫어요 조회용 커버링 인덱스
+    INDEX idx_created_at (created_at),             -- 시간순 평가 데이터 분할(export_feedback) 시 키셋 조회용
+
+    -- 고유 인덱스: 사용자당 기사별 피드백은 하나만 유지 (INSERT ... ON DUPLICATE KEY UPDATE로 갱신)
+    UNIQUE INDEX uk_user_article (user_id, article_id)
 ) ENGINE=InnoDB;
 
 -- 6. user_searches 테이블: 사용자 검색어 저장
@@ -96,10 +106,10 @@ CREATE TABLE user_searches (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE, -- user 삭제 시 관련 검색 기록 자동 삭제
 
     -- 인덱스 추가: 검색 이력 조회 및 분석 성능 최적화
-    INDEX idx_user_id (user_id),                   -- 특정 사용자의 검색 기록 조회 시 효율적
     -- search_term(50)은 검색어의 앞 50자만 인덱싱하여 인덱스 크기 및 성능 최적화
     INDEX idx_search_term (search_term(50)),
-    INDEX idx_timestamp (timestamp)                -- 시간대별 검색어 트렌드 분석 시 효율적
+    INDEX idx_timestamp (timestamp),               -- 시간대별 검색어 트렌드 분석 시 효율적
+    INDEX idx_user_search_term (user_id, search_term) -- 사용자별 검색어 GROUP BY를 인덱스 순서대로 처리 (filesort 제거)
 ) ENGINE=InnoDB;
 
 -- 7. user_article_log 테이블: 사용자 기사 행동 로그(조회, 클릭 등) 저장
@@ -117,10 +127,10 @@ CREATE TABLE user_article_log (
     FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE, -- article 삭제 시 관련 행동 로그 자동 삭제
 
     -- 인덱스 추가: 사용자 행동 분석 및 추천 모델 학습 데이터 조회 성능 최적화
-    INDEX idx_user_id (user_id),                   -- 특정 사용자의 행동 로그 조회 시 효율적
     INDEX idx_article_id (article_id),             -- 특정 기사에 대한 행동 로그 조회 시 효율적
     INDEX idx_action_type (action_type),           -- 특정 행동 타입의 로그 조회 시 효율적
-    INDEX idx_timestamp (timestamp)                -- 시간대별 행동 트렌드 분석 시 효율적
+    INDEX idx_timestamp (timestamp),               -- 시간대별 행동 트렌드 분석 시 효율적
+    INDEX idx_user_action_article (user_id, action_type, article_id) -- 추천 시 사용자별 행동 로그 조회용 커버링 인덱스
 ) ENGINE=InnoDB;
 
 -- 8. recommended_articles 테이블: 추천 기사 저장
@@ -142,10 +152,10 @@ CREATE TABLE recommended_articles (
     FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE, -- article 삭제 시 관련 추천 기록 자동 삭제
 
     -- 인덱스 추가: 추천 이력 조회 및 분석 성능 최적화
-    INDEX idx_user_id (user_id),                     -- 특정 사용자의 모든 추천 기록 조회 시 효율적
     INDEX idx_recommended_at (recommended_at),       -- 특정 기간에 생성된 추천 기록 조회 시 효율적
     INDEX idx_user_batch (user_id, batch_id),        -- 특정 사용자의 특정 배치 추천 기록 조회 시 효율적
     INDEX idx_user_session (user_id, recommendation_session_id), -- 특정 사용자의 특정 세션 추천 기록 조회 시 효율적
+    INDEX idx_user_algorithm_time (user_id, recommendation_algorithm_version, recommended_at), -- 알고리즘별 최신 추천 묶음 조회 시 효율적
 
     -- 고유 인덱스: 동일 사용자가 동일 기사를 동일 시각에 중복 추천받는 것을 방지
     -- 이는 주로 데이터 무결성을 위한 제약이며, 실제 애플리케이션 로직에서 중복 삽입을 처리해야 합니다.
@@ -0,0 +1,16 @@
+-- 기존 AI_master DB에 user_feedback 고유 인덱스(uk_user_article)를 추가합니다.
+-- init_db.sql로 새로 만든 DB에는 이미 포함되어 있으므로 적용하지 않아도 됩니다.
+USE AI_master;
+
+-- 1. 사용자/기사별 중복 피드백 정리: 가장 최근(id가 가장 큰) 피드백 하나만 남깁니다.
+--    (INSERT ... ON DUPLICATE KEY UPDATE가 마지막 피드백으로 갱신하는 것과 같은 결과)
+DELETE older
+FROM user_feedback AS older
+JOIN user_feedback AS newer
+  ON newer.user_id = older.user_id
+ AND newer.article_id = older.article_id
+ AND newer.id > older.id;
+
+-- 2. 고유 인덱스 추가: 이후 피드백은 사용자당 기사별 한 행으로 갱신됩니다.
+ALTER TABLE user_feedback
+    ADD UNIQUE INDEX uk_user_article (user_id, article_id);
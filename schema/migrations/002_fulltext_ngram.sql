@@ -0,0 +1,17 @@
+-- 기존 AI_master DB에 검색용 FULLTEXT(ngram) 인덱스를 추가합니다.
+-- init_db.sql로 새로 만든 DB에는 이미 포함되어 있으므로 적용하지 않아도 됩니다.
+USE AI_master;
+
+-- FULLTEXT(ngram) 인덱스는 생성 시점의 stopword 설정을 그대로 사용합니다.
+-- 기본 영어 stopword('a', 'in', 'it' 등)를 포함한 ngram 토큰은 모두 버려져 'AI', 'IT' 같은 검색어를 찾지 못하므로 끕니다.
+SET SESSION innodb_ft_enable_stopword = OFF;
+
+-- 기사 제목/요약 검색용 전문 인덱스 (한글은 ngram 파서 필요)
+-- stopword 설정 없이 이미 만들었다면 먼저 ALTER TABLE articles DROP INDEX ft_title_summary; 후 다시 생성
+ALTER TABLE articles
+    ADD FULLTEXT INDEX ft_title_summary (title, summary) WITH PARSER ngram;
+
+-- 키워드 부분 일치 검색용 전문 인덱스
+-- stopword 설정 없이 이미 만들었다면 먼저 ALTER TABLE keywords DROP INDEX ft_keyword_text; 후 다시 생성
+ALTER TABLE keywords
+    ADD FULLTEXT INDEX ft_keyword_text (keyword_text) WITH PARSER ngram;
@@ -0,0 +1,19 @@
+-- 기존 AI_master DB에 추천/검색 쿼리용 커버링 복합 인덱스를 추가합니다.
+-- init_db.sql로 새로 만든 DB에는 이미 포함되어 있으므로 적용하지 않아도 됩니다.
+USE AI_master;
+
+-- 키워드 → 기사 조인 시 커버링 인덱스로 테이블 접근 없이 처리
+ALTER TABLE article_keywords
+    ADD INDEX idx_keyword_article (keyword_id, article_id);
+
+-- 추천 시 사용자별 피드백/싫어요 조회용 커버링 인덱스
+ALTER TABLE user_feedback
+    ADD INDEX idx_user_article_type (user_id, article_id, feedback_type);
+
+-- 사용자별 검색어 GROUP BY를 인덱스 순서대로 처리 (filesort 제거)
+ALTER TABLE user_searches
+    ADD INDEX idx_user_search_term (user_id, search_term);
+
+-- 추천 시 사용자별 행동 로그 조회용 커버링 인덱스
+ALTER TABLE user_article_log
+    ADD INDEX idx_user_action_article (user_id, action_type, article_id);
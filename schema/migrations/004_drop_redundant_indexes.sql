@@ -0,0 +1,26 @@
+-- 기존 AI_master DB에서 복합 인덱스의 앞부분과 겹치는 단일 컬럼 인덱스를 삭제합니다.
+-- 대신 사용할 복합 인덱스는 003_covering_indexes.sql에서 만들어지므로 반드시 그 다음에 적용합니다.
+-- (외래 키가 사용하는 인덱스도 아래 복합 인덱스가 대신하므로 삭제할 수 있습니다.)
+-- init_db.sql로 새로 만든 DB에는 처음부터 없으므로 적용하지 않아도 됩니다.
+USE AI_master;
+
+-- idx_article_id → PRIMARY KEY (article_id, keyword_id), idx_keyword_id → idx_keyword_article (keyword_id, article_id)
+ALTER TABLE article_keywords
+    DROP INDEX idx_article_id,
+    DROP INDEX idx_keyword_id;
+
+-- idx_user_id → idx_user_article_type (user_id, article_id, feedback_type)
+ALTER TABLE user_feedback
+    DROP INDEX idx_user_id;
+
+-- idx_user_id → idx_user_search_term (user_id, search_term)
+ALTER TABLE user_searches
+    DROP INDEX idx_user_id;
+
+-- idx_user_id → idx_user_action_article (user_id, action_type, article_id)
+ALTER TABLE user_article_log
+    DROP INDEX idx_user_id;
+
+-- idx_user_id → idx_user_batch (user_id, batch_id)
+ALTER TABLE recommended_articles
+    DROP INDEX idx_user_id;
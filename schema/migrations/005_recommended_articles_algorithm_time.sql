@@ -0,0 +1,7 @@
+-- 기존 AI_master DB에 알고리즘별 최신 추천 묶음 조회용 인덱스를 추가합니다.
+-- init_db.sql로 새로 만든 DB에는 이미 포함되어 있으므로 적용하지 않아도 됩니다.
+USE AI_master;
+
+-- get_recommended_articles / store_recommendations의 MAX(recommended_at) 조회를 인덱스만으로 처리
+ALTER TABLE recommended_articles
+    ADD INDEX idx_user_algorithm_time (user_id, recommendation_algorithm_version, recommended_at);
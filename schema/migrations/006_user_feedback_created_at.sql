@@ -0,0 +1,7 @@
+-- 기존 AI_master DB에 피드백 생성 시각 인덱스를 추가합니다.
+-- init_db.sql로 새로 만든 DB에는 이미 포함되어 있으므로 적용하지 않아도 됩니다.
+USE AI_master;
+
+-- 시간순 평가 데이터 분할(export_feedback) 시 키셋 조회용 (페이지마다 filesort 방지)
+ALTER TABLE user_feedback
+    ADD INDEX idx_created_at (created_at);